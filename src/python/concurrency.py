@@ -0,0 +1,149 @@
+"""
+AURA Cloud Studio - Concurrency Runtime
+
+asyncio 이벤트 루프 위에서 블로킹 작업(모델 추론 / DSP / 디스크)을 돌리기 위한 도구.
+
+- TrackedExecutor: 이름 붙은 스레드 풀 + 대기/실행/완료 카운터와 대기·실행 시간 통계
+- LoopLagMonitor: 이벤트 루프가 얼마나 늦게 깨어나는지 측정 (블로킹 호출 감지)
+
+STT(CTranslate2), numpy/FFT, pedalboard 는 연산 중 GIL 을 풀기 때문에 스레드 풀로도
+실제 코어 병렬 처리가 된다.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# 루프 지연 샘플 보관 개수 (p99 계산용)
+LAG_HISTORY = 240
+
+
+class TrackedExecutor(ThreadPoolExecutor):
+    """
+    작업 수와 시간을 집계하는 ThreadPoolExecutor
+
+    loop.run_in_executor() 에 그대로 넘길 수 있다.
+
+    Args:
+        name: 풀 이름 (스레드 이름 접두사 / 통계 키)
+        max_workers: 워커 스레드 수
+    """
+
+    def __init__(self, name, max_workers):
+        super().__init__(max_workers=max_workers, thread_name_prefix=f"aura-{name}")
+        self.name = name
+        self.max_workers = max_workers
+        self._stats_lock = threading.Lock()
+        self.submitted = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_time = 0.0
+        self.run_time = 0.0
+        self.max_wait = 0.0
+
+    def submit(self, fn, *args, **kwargs):
+        queued_at = time.perf_counter()
+        with self._stats_lock:
+            self.submitted += 1
+
+        def run():
+            started = time.perf_counter()
+            waited = started - queued_at
+            with self._stats_lock:
+                self.active += 1
+                self.wait_time += waited
+                self.max_wait = max(self.max_wait, waited)
+            failed = False
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                with self._stats_lock:
+                    self.active -= 1
+                    self.completed += 1
+                    self.failed += failed
+                    self.run_time += time.perf_counter() - started
+
+        return super().submit(run)
+
+    @property
+    def pending(self):
+        """아직 끝나지 않은 작업 수 (실행 중 + 대기 중)"""
+        return self.submitted - self.completed
+
+    def stats(self):
+        with self._stats_lock:
+            started = (self.completed + self.active) or 1
+            done = self.completed or 1
+            return {
+                'name': self.name,
+                'workers': self.max_workers,
+                'active': self.active,
+                'queued': self.submitted - self.completed - self.active,
+                'completed': self.completed,
+                'failed': self.failed,
+                'avg_wait_ms': round(self.wait_time / started * 1000, 2),
+                'max_wait_ms': round(self.max_wait * 1000, 2),
+                'avg_run_ms': round(self.run_time / done * 1000, 2),
+            }
+
+
+class LoopLagMonitor:
+    """
+    이벤트 루프 지연 측정
+
+    interval 마다 sleep 한 뒤 예정 시각보다 얼마나 늦게 깨어났는지를 잰다.
+    지연이 warn_ms 를 넘으면 누군가 루프를 블로킹한 것 → 경고 출력.
+
+    Args:
+        interval: 측정 주기 (초)
+        warn_ms: 경고 기준 지연 (밀리초)
+    """
+
+    def __init__(self, interval=0.25, warn_ms=50.0):
+        self.interval = interval
+        self.warn_ms = warn_ms
+        self.samples = deque(maxlen=LAG_HISTORY)
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag * 1000 > self.warn_ms:
+                self.stalls += 1
+                print(f"[AURA-LOOP] Event loop stalled for {lag * 1000:.1f}ms")
+
+    def stats(self):
+        lags = np.array(self.samples) * 1000 if self.samples else np.zeros(1)
+        return {
+            'lag_ms_avg': round(float(lags.mean()), 2),
+            'lag_ms_p99': round(float(np.percentile(lags, 99)), 2),
+            'lag_ms_max': round(self.max_lag * 1000, 2),
+            'stalls': self.stalls,
+            'warn_ms': self.warn_ms,
+        }
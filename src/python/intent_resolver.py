@@ -0,0 +1,295 @@
+"""
+AURA Cloud Studio - Voice Intent Resolver
+
+STT 결과 텍스트를 미리 컴파일된 명령 테이블과 퍼지 매칭해서
+"재생", "멈춰", "템포 120" 같은 단순 명령은 LLM 을 거치지 않고 바로 구조화된 명령으로 돌려준다.
+
+- 한글은 자모 단위로 분해해서 비교 (Whisper 의 받침/모음 오인식에 강함: "재생" ≈ "제생")
+- 영어는 소문자 문자 단위로 비교
+- 매칭되지 않은 문장만 LLM 으로 넘어간다
+"""
+
+import re
+
+# ============================================
+# Hangul Jamo Decomposition
+# ============================================
+
+HANGUL_BASE = 0xAC00
+HANGUL_END = 0xD7A3
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = " ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+
+_NON_WORD = re.compile(r"[^\w\s]")
+
+
+def to_jamo(text):
+    """한글 음절을 초성/중성/종성 자모로 분해 (그 외 문자는 그대로)"""
+    out = []
+    for ch in text:
+        code = ord(ch)
+        if HANGUL_BASE <= code <= HANGUL_END:
+            offset = code - HANGUL_BASE
+            out.append(CHOSEONG[offset // 588])
+            out.append(JUNGSEONG[(offset % 588) // 28])
+            if offset % 28:
+                out.append(JONGSEONG[offset % 28])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def normalize(text):
+    """소문자화 + 문장부호 제거 + 공백 정리"""
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+def similarity(a, b, min_score=0.0):
+    """
+    정규화된 Levenshtein 유사도 (0.0 ~ 1.0)
+
+    min_score 에 못 미칠 것이 확실해지면 조기 종료한다.
+    """
+    if a == b:
+        return 1.0
+    longest = max(len(a), len(b))
+    if not longest:
+        return 1.0
+    max_dist = int((1.0 - min_score) * longest)
+    if abs(len(a) - len(b)) > max_dist:
+        return 0.0
+
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        cur = [i]
+        row_min = i
+        for j, cb in enumerate(b, start=1):
+            d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            cur.append(d)
+            if d < row_min:
+                row_min = d
+        if row_min > max_dist:
+            return 0.0
+        prev = cur
+    return 1.0 - prev[-1] / longest
+
+
+# ============================================
+# Number Parsing (Tempo)
+# ============================================
+
+_DIGITS = re.compile(r"\d+(?:\.\d+)?")
+
+SINO_DIGITS = {'일': 1, '이': 2, '삼': 3, '사': 4, '오': 5, '육': 6, '칠': 7, '팔': 8, '구': 9}
+SINO_UNITS = {'십': 10, '백': 100}
+
+
+def parse_sino_korean(word):
+    """한자어 수사 파싱 ("백이십" → 120). 수사가 아니면 None"""
+    if not word or any(ch not in SINO_DIGITS and ch not in SINO_UNITS for ch in word):
+        return None
+    total, digit = 0, 0
+    for ch in word:
+        if ch in SINO_DIGITS:
+            digit = SINO_DIGITS[ch]
+        else:
+            total += (digit or 1) * SINO_UNITS[ch]
+            digit = 0
+    return total + digit
+
+
+def find_number(text):
+    """
+    문장에서 첫 번째 숫자 (아라비아 숫자 우선, 없으면 한자어 수사)
+
+    Returns:
+        (value, 숫자 부분 문자열) 또는 (None, None)
+    """
+    match = _DIGITS.search(text)
+    if match:
+        return float(match.group()), match.group()
+    for token in text.split():
+        # "백이십으로" 같은 조사 결합형 처리
+        for end in range(len(token), 0, -1):
+            value = parse_sino_korean(token[:end])
+            if value is not None and end >= 2:
+                return float(value), token[:end]
+    return None, None
+
+
+# ============================================
+# Command Table
+# ============================================
+
+# (intent, phrases, args) - 앞에 있을수록 우선순위가 높다 (정지는 항상 재생보다 먼저)
+COMMAND_TABLE = [
+    ('transport.stop', ['정지', '멈춰', '중지', '그만', '스톱', '꺼', 'stop', 'halt', 'silence'], {}),
+    ('transport.pause', ['일시정지', '일시 정지', '잠깐 멈춰', 'pause'], {}),
+    ('transport.play', ['재생', '시작', '틀어', '플레이', 'play', 'start', 'resume'], {}),
+    ('transport.tempo', ['빠르게', '템포 올려', 'faster', 'speed up', 'tempo up'], {'delta': 5}),
+    ('transport.tempo', ['느리게', '템포 내려', 'slower', 'slow down', 'tempo down'], {'delta': -5}),
+]
+
+# 숫자와 함께 오면 절대 템포 지정 ("템포 120", "BPM 백이십으로", "set tempo to 90")
+TEMPO_KEYWORDS = ['템포', '비피엠', '빠르기', 'tempo', 'bpm']
+
+# 템포 명령에 흔히 붙는 동사 / 군더더기 (커버리지 계산에서 제외)
+TEMPO_FILLERS = ['바꿔', '맞춰', '설정', '변경', '해줘', '해', '줘', '좀',
+                 'set', 'change', 'make', 'to', 'it', 'the', 'please']
+
+# 재생/정지 명령에 흔히 붙는 어미 / 목적어 / 군더더기 (커버리지 계산에서 제외)
+# "재생해 주세요", "음악 꺼줘", "stop the music", "start playback"
+COMMAND_FILLERS = ['주세요', '줘', '해', '좀', '지금', '다시', '음악', '노래', '비트', '곡',
+                   'please', 'now', 'the', 'a', 'it', 'music', 'song', 'beat', 'track', 'playback']
+
+MIN_TEMPO = 20
+MAX_TEMPO = 300
+
+DEFAULT_THRESHOLD = 0.75
+
+# 명령 구문이 발화에서 차지해야 하는 최소 비율 (자모 길이 기준)
+# "트랩 비트는 어떻게 시작해?" 같은 질문이 '시작' 명령으로 잘못 잡히는 것을 막는다.
+DEFAULT_MIN_COVERAGE = 0.4
+
+
+def is_filler(word_jamo, fillers_jamo):
+    """
+    군더더기 단어인지
+
+    한글은 조사/어미가 붙으므로 접두 일치 ("음악을", "해줘"), 영어는 단어 전체 일치 ('a' ≠ "again").
+    """
+    return any(
+        word_jamo == filler or (not filler.isascii() and word_jamo.startswith(filler))
+        for filler in fillers_jamo
+    )
+
+
+def content_length(words_jamo, fillers_jamo):
+    """군더더기를 뺀 발화 길이 (자모 기준)"""
+    return sum(len(word) for word in words_jamo if not is_filler(word, fillers_jamo))
+
+
+class CompiledPhrase:
+    __slots__ = ('intent', 'text', 'jamo', 'num_words', 'args')
+
+    def __init__(self, intent, text, args):
+        self.intent = intent
+        self.text = text
+        self.jamo = to_jamo(normalize(text)).replace(" ", "")
+        self.num_words = len(text.split())
+        self.args = args
+
+
+class IntentResolver:
+    """
+    Transcript → 구조화된 명령
+
+    Args:
+        table: (intent, phrases, args) 리스트
+        threshold: 퍼지 매칭 최소 유사도
+        min_coverage: 매칭 구문이 발화 전체에서 차지해야 하는 최소 비율
+    """
+
+    def __init__(self, table=COMMAND_TABLE, threshold=DEFAULT_THRESHOLD,
+                 min_coverage=DEFAULT_MIN_COVERAGE):
+        self.threshold = threshold
+        self.min_coverage = min_coverage
+        self.phrases = [
+            CompiledPhrase(intent, phrase, args)
+            for intent, phrases, args in table
+            for phrase in phrases
+        ]
+        self.tempo_keywords = [to_jamo(k) for k in TEMPO_KEYWORDS]
+        self.tempo_fillers = [to_jamo(f) for f in TEMPO_FILLERS]
+        self.command_fillers = [to_jamo(f) for f in COMMAND_FILLERS]
+
+        # 정확 매칭용 인덱스 (자모 문자열 → 가장 우선순위 높은 구문)
+        self.exact = {}
+        for phrase in self.phrases:
+            self.exact.setdefault(phrase.jamo, phrase)
+
+    def _match_tempo(self, text, words_jamo):
+        """절대 템포 지정 명령"""
+        bpm, number_text = find_number(text)
+        if bpm is None:
+            return None
+        keyword_len = max((
+            len(keyword)
+            for word in words_jamo
+            for keyword in self.tempo_keywords
+            if word.startswith(keyword) or similarity(word, keyword, self.threshold) >= self.threshold
+        ), default=0)
+        if not keyword_len:
+            return None
+        if not MIN_TEMPO <= bpm <= MAX_TEMPO:
+            return None
+
+        # 키워드 + 숫자가 발화(명령 동사 제외)의 충분한 비율이어야 명령으로 본다
+        # ("템포가 128인 노래 추천해줘", "템포 120 정도면 괜찮을까?" 는 LLM 으로)
+        content_len = content_length(words_jamo, self.tempo_fillers)
+        if keyword_len + len(to_jamo(number_text)) < self.min_coverage * content_len:
+            return None
+        return {
+            'intent': 'transport.tempo',
+            'args': {'bpm': bpm},
+            'score': 1.0,
+            'matched': text,
+        }
+
+    def resolve(self, transcript):
+        """
+        Returns:
+            {'intent', 'args', 'score', 'matched'} 또는 None (LLM 으로 넘길 문장)
+        """
+        text = normalize(transcript)
+        if not text:
+            return None
+
+        words = text.split()
+        words_jamo = [to_jamo(w) for w in words]
+        # 어미 / 목적어 ("주세요", "the music") 를 뺀 길이로 커버리지 판정
+        total_len = content_length(words_jamo, self.command_fillers)
+
+        tempo = self._match_tempo(text, words_jamo)
+        if tempo:
+            return tempo
+
+        # 발화 전체가 명령 구문 그대로인 경우 (가장 흔한 케이스) → 사전 조회 한 번
+        phrase = self.exact.get("".join(words_jamo))
+        if phrase:
+            return {'intent': phrase.intent, 'args': dict(phrase.args), 'score': 1.0, 'matched': phrase.text}
+
+        # 어미/조사만 붙은 경우 ("재생해줘", "stop please") → 접두 일치로 확정
+        joined = "".join(words_jamo)
+        for phrase in self.phrases:
+            if len(phrase.jamo) >= self.min_coverage * total_len and (
+                    joined.startswith(phrase.jamo)
+                    or any(w.startswith(phrase.jamo) for w in words_jamo)):
+                return {'intent': phrase.intent, 'args': dict(phrase.args), 'score': 1.0, 'matched': phrase.text}
+
+        best = None
+        for phrase in self.phrases:
+            # 발화에 비해 너무 짧은 구문은 거리 계산 전에 제외
+            if len(phrase.jamo) < self.min_coverage * total_len:
+                continue
+            n = phrase.num_words
+            # 같은 단어 수의 n-gram 과 비교 (한국어 조사/어미 허용을 위해 접두부도 비교)
+            for i in range(len(words_jamo) - n + 1):
+                window = "".join(words_jamo[i:i + n])
+                score = similarity(window, phrase.jamo, self.threshold)
+                if score < self.threshold and len(window) > len(phrase.jamo):
+                    score = similarity(window[:len(phrase.jamo)], phrase.jamo, self.threshold)
+                if score < self.threshold:
+                    continue
+                if best is None or score > best['score']:
+                    best = {
+                        'intent': phrase.intent,
+                        'args': dict(phrase.args),
+                        'score': round(score, 3),
+                        'matched': phrase.text,
+                    }
+            if best and best['score'] == 1.0:
+                break  # 테이블 순서 = 우선순위 → 정확 매칭이면 즉시 확정
+        return best
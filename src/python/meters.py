@@ -0,0 +1,332 @@
+"""
+AURA Cloud Studio - Metering
+
+엔진 출력 / 트랙 신호의 피크, RMS, LUFS 스타일 라우드니스, 스펙트럼 밴드를
+hop 단위로 증분 계산하고, UI 갱신 주기(기본 30Hz)마다 바이너리 프레임 하나로 묶어 보낸다.
+
+- 미터마다 lock-free 링버퍼 (생산자 1 / 소비자 1, 카운터는 단조 증가)
+- 이번 tick 에 새로 찬 hop 들만 처리 → 모든 미터/hop 윈도우를 모아서 rfft 한 번
+- 이전 프레임과 값이 같은 미터는 프레임에서 생략 (무음 트랙이 소켓을 채우지 않음)
+
+Frame 포맷 (little endian):
+    header: magic(2s "AM") | layout_version(u16) | seq(u32) | count(u16) | num_bands(u16)
+    record: meter_index(u16) | peak(u8) | rms(u8) | lufs(u8) | bands(u8 × num_bands)
+    값은 dB 를 0.5dB 단위로 양자화: q = 255 + 2 × dB  (255 = 0dBFS, 0 = -127.5dB 이하)
+"""
+
+import time
+import struct
+from collections import deque
+
+import numpy as np
+
+SAMPLE_RATE = 44100
+
+FFT_SIZE = 2048
+HOP_SIZE = 1024
+RING_CAPACITY = 1 << 15  # 약 0.74초 @ 44.1kHz (RMS / FFT 윈도우보다 넉넉하게)
+
+# 미터당 재생 대기 클립 한도 - tick 이 안 도는 동안 play() 가 쌓는 양 제한
+MAX_PENDING_SECONDS = 4.0
+
+RMS_WINDOW_SECONDS = 0.3
+LUFS_WINDOW_SECONDS = 0.4  # EBU R128 Momentary
+
+NUM_BANDS = 24
+BAND_MIN_HZ = 40.0
+BAND_MAX_HZ = 16000.0
+
+# 피크 / 밴드 폴백 속도 (dB/s) - 값이 뚝뚝 끊기지 않고 부드럽게 떨어지도록
+PEAK_FALLOFF_DB = 20.0
+BAND_FALLOFF_DB = 30.0
+
+FLOOR_DB = -127.5
+
+FRAME_MAGIC = b"AM"
+FRAME_HEADER = struct.Struct("<2sHIHH")
+RECORD_HEADER = struct.Struct("<HBBB")
+
+# ITU-R BS.1770 K-weighting (48kHz 기준 계수) - 주파수 응답만 FFT 빈에 곱해서 사용
+K_STAGE1 = ([1.53512485958697, -2.69169618940638, 1.19839281085285], [1.0, -1.69065929318241, 0.73248077421585])
+K_STAGE2 = ([1.0, -2.0, 1.0], [1.0, -1.99004745483398, 0.99007225036621])
+
+
+def quantize_db(db):
+    """dB → u8 (0.5dB 단위)"""
+    return np.clip(np.round(255 + 2 * np.asarray(db)), 0, 255).astype(np.uint8)
+
+
+def to_db(power):
+    """파워(제곱 평균) → dB"""
+    return 10 * np.log10(np.maximum(power, 1e-13))
+
+
+def _biquad_power(coeffs, w):
+    b, a = coeffs
+    z = np.exp(-1j * w)
+    num = b[0] + b[1] * z + b[2] * z * z
+    den = a[0] + a[1] * z + a[2] * z * z
+    return np.abs(num / den) ** 2
+
+
+class _Analysis:
+    """sample_rate 별로 한 번만 만드는 분석 테이블 (윈도우, 밴드 경계, K-weighting)"""
+
+    def __init__(self, sample_rate):
+        self.window = np.hanning(FFT_SIZE).astype(np.float32)
+        self.window_power = float(np.sum(self.window ** 2))
+
+        freqs = np.fft.rfftfreq(FFT_SIZE, 1.0 / sample_rate)
+
+        # rfft 파시발 가중치 (DC / Nyquist 는 1, 나머지는 양/음 주파수 합쳐서 2)
+        parseval = np.full(freqs.shape, 2.0)
+        parseval[0] = parseval[-1] = 1.0
+        norm = parseval / (FFT_SIZE * self.window_power)
+
+        w = 2 * np.pi * freqs / 48000.0
+        k_weight = _biquad_power(K_STAGE1, w) * _biquad_power(K_STAGE2, w)
+        self.k_weight = (k_weight * norm).astype(np.float32)
+        self.norm = norm.astype(np.float32)
+
+        # 로그 간격 밴드 → 각 밴드의 시작 빈 (reduceat 용)
+        edges = np.geomspace(BAND_MIN_HZ, BAND_MAX_HZ, NUM_BANDS + 1)
+        starts = np.searchsorted(freqs, edges[:-1])
+        stops = np.maximum(np.searchsorted(freqs, edges[1:]), starts + 1)
+        self.band_starts = starts
+        self.band_sizes = (stops - starts).astype(np.float32)
+        self.band_edges = edges
+
+
+class Meter:
+    """
+    미터 하나 (링버퍼 + 증분 상태)
+
+    write() 는 생산자 스레드(오디오 콜백 등) 하나에서만, 나머지는 tick 스레드에서만 호출한다.
+    """
+
+    def __init__(self, meter_id, sample_rate):
+        self.meter_id = meter_id
+        self.ring = np.zeros(RING_CAPACITY, dtype=np.float32)
+        self.written = 0     # 생산자가 쓴 총 샘플 수 (단조 증가)
+        self.processed = 0   # 분석이 끝난 hop 경계
+
+        # 실시간 재생 속도로 흘려 넣을 클립 (sd.play 처럼 한 번에 넘겨받는 소스용)
+        self.pending = deque()
+
+        rms_hops = max(1, round(RMS_WINDOW_SECONDS * sample_rate / HOP_SIZE))
+        lufs_hops = max(1, round(LUFS_WINDOW_SECONDS * sample_rate / HOP_SIZE))
+        self.hop_energy = deque([0.0] * rms_hops, maxlen=rms_hops)
+        self.hop_kpower = deque([0.0] * lufs_hops, maxlen=lufs_hops)
+
+        self.peak_db = FLOOR_DB
+        self.rms_db = FLOOR_DB
+        self.lufs = FLOOR_DB
+        self.bands_db = np.full(NUM_BANDS, FLOOR_DB, dtype=np.float32)
+        self.last_record = None
+
+    def write(self, block):
+        """샘플 블록 추가 (스테레오 이상은 모노로 다운믹스)"""
+        block = np.asarray(block, dtype=np.float32)
+        if block.ndim == 2:
+            # (frames, channels) 또는 (channels, frames) 모두 허용 - 짧은 축을 채널로 본다
+            block = block.mean(axis=1 if block.shape[0] >= block.shape[1] else 0)
+        n = len(block)
+        if n >= RING_CAPACITY:
+            block, n = block[-RING_CAPACITY:], RING_CAPACITY
+
+        start = self.written % RING_CAPACITY
+        first = min(n, RING_CAPACITY - start)
+        self.ring[start:start + first] = block[:first]
+        self.ring[:n - first] = block[first:]
+        self.written += n  # 데이터를 다 쓴 뒤에 카운터 공개
+
+    def read(self, end, size):
+        """[end - size, end) 구간 (end 는 절대 샘플 위치)"""
+        start = (end - size) % RING_CAPACITY
+        if start + size <= RING_CAPACITY:
+            return self.ring[start:start + size]
+        return np.concatenate([self.ring[start:], self.ring[:start + size - RING_CAPACITY]])
+
+    def feed_pending(self, num_samples):
+        """대기 중인 클립에서 실시간 분량만큼 링버퍼로"""
+        while num_samples > 0 and self.pending:
+            clip = self.pending[0]
+            take = clip[:num_samples]
+            self.write(take)
+            num_samples -= len(take)
+            if len(take) == len(clip):
+                self.pending.popleft()
+            else:
+                self.pending[0] = clip[len(take):]
+
+
+class MeterBank:
+    """
+    미터 묶음 + 프레임 생성기
+
+    Args:
+        sample_rate: 입력 샘플레이트
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.analysis = _Analysis(sample_rate)
+        self.meters = {}
+        self.layout = []          # 프레임의 meter_index → meter_id
+        self.layout_version = 0
+        self.seq = 0
+        self._last_tick = None
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+
+    def ensure(self, meter_id):
+        meter = self.meters.get(meter_id)
+        if meter is None:
+            meter = Meter(meter_id, self.sample_rate)
+            self.meters[meter_id] = meter
+            self.layout.append(meter_id)
+            self.layout_version = (self.layout_version + 1) & 0xFFFF
+        return meter
+
+    def remove(self, meter_id):
+        if self.meters.pop(meter_id, None) is not None:
+            self.layout.remove(meter_id)
+            self.layout_version = (self.layout_version + 1) & 0xFFFF
+
+    def push(self, meter_id, block):
+        """스트리밍 소스 (오디오 콜백 등) - 이미 실시간으로 들어오는 블록"""
+        self.ensure(meter_id).write(block)
+
+    def play(self, meter_id, clip):
+        """
+        한 번에 넘겨받은 클립 - tick 마다 재생 속도만큼 흘려 넣는다
+
+        대기 중인 분량이 MAX_PENDING_SECONDS 를 넘으면 버린다 (tick 이 안 도는 동안 무한히 쌓이지 않도록).
+        Returns:
+            대기열에 들어갔는지
+        """
+        meter = self.ensure(meter_id)
+        # 대기열은 tick 스레드만 줄인다 → 여기서는 추가 여부만 결정 (lock 없이 안전)
+        if sum(len(pending) for pending in list(meter.pending)) >= MAX_PENDING_SECONDS * self.sample_rate:
+            return False
+        clip = np.asarray(clip, dtype=np.float32)
+        if clip.ndim == 2:
+            clip = clip.mean(axis=1 if clip.shape[0] >= clip.shape[1] else 0)
+        meter.pending.append(clip)
+        return True
+
+    # ------------------------------------------------------------------
+    # Analysis
+    # ------------------------------------------------------------------
+
+    def _collect_hops(self):
+        """새로 완성된 hop 들: [(meter, hop_end), ...]"""
+        hops = []
+        for meter in list(self.meters.values()):
+            written = meter.written
+            # 너무 밀렸으면 (tick 이 늦음) 링버퍼에 남아 있는 최근 구간만 분석
+            oldest = written - RING_CAPACITY + FFT_SIZE
+            if meter.processed < oldest:
+                meter.processed = oldest - oldest % HOP_SIZE
+            while meter.processed + HOP_SIZE <= written:
+                meter.processed += HOP_SIZE
+                hops.append((meter, meter.processed))
+        return hops
+
+    def _analyze(self, hops, elapsed):
+        a = self.analysis
+        if hops:
+            # 모든 미터의 새 hop 윈도우를 쌓아서 rfft 한 번
+            windows = np.stack([m.read(end, FFT_SIZE) for m, end in hops])
+            hop_blocks = windows[:, -HOP_SIZE:]
+            peaks = np.max(np.abs(hop_blocks), axis=1)
+            energies = np.einsum('ij,ij->i', hop_blocks, hop_blocks)
+
+            power = np.abs(np.fft.rfft(windows * a.window, axis=1)) ** 2
+            k_power = power @ a.k_weight
+            band_power = np.add.reduceat(power * a.norm, a.band_starts, axis=1) / a.band_sizes
+            band_db = to_db(band_power)
+        else:
+            peaks = energies = k_power = band_db = ()
+
+        fresh_peak = {}
+        fresh_bands = {}
+        for i, (meter, _) in enumerate(hops):
+            meter.hop_energy.append(float(energies[i]))
+            meter.hop_kpower.append(float(k_power[i]))
+            fresh_peak[meter.meter_id] = max(fresh_peak.get(meter.meter_id, 0.0), float(peaks[i]))
+            prev = fresh_bands.get(meter.meter_id)
+            fresh_bands[meter.meter_id] = band_db[i] if prev is None else np.maximum(prev, band_db[i])
+
+        for meter in list(self.meters.values()):
+            # 새 값이 더 크면 즉시, 아니면 폴백 속도로 하강
+            peak_db = FLOOR_DB
+            if meter.meter_id in fresh_peak:
+                peak_db = 20 * np.log10(max(fresh_peak[meter.meter_id], 1e-7))
+            meter.peak_db = max(peak_db, meter.peak_db - PEAK_FALLOFF_DB * elapsed, FLOOR_DB)
+
+            bands = fresh_bands.get(meter.meter_id)
+            fallen = np.maximum(meter.bands_db - BAND_FALLOFF_DB * elapsed, FLOOR_DB)
+            meter.bands_db = fallen if bands is None else np.maximum(fallen, bands)
+
+            if meter.meter_id in fresh_peak:
+                meter.rms_db = float(to_db(sum(meter.hop_energy) / (len(meter.hop_energy) * HOP_SIZE)))
+                meter.lufs = float(-0.691 + to_db(sum(meter.hop_kpower) / len(meter.hop_kpower)))
+            elif not meter.pending and meter.written == meter.processed:
+                # 입력이 멈춘 미터는 RMS / LUFS 도 함께 떨어뜨림
+                meter.rms_db = max(meter.rms_db - PEAK_FALLOFF_DB * elapsed, FLOOR_DB)
+                meter.lufs = max(meter.lufs - PEAK_FALLOFF_DB * elapsed, FLOOR_DB)
+
+    # ------------------------------------------------------------------
+    # Frame
+    # ------------------------------------------------------------------
+
+    def tick(self, now=None):
+        """
+        UI tick 한 번 - 바뀐 미터만 담은 프레임 바이트 (바뀐 게 없으면 None)
+        """
+        now = time.monotonic() if now is None else now
+        elapsed = 0.0 if self._last_tick is None else now - self._last_tick
+        self._last_tick = now
+
+        due = int(round(elapsed * self.sample_rate))
+        # 생산자 스레드가 미터를 추가할 수 있으므로 스냅샷으로 순회
+        for meter in list(self.meters.values()):
+            if meter.pending:
+                meter.feed_pending(due)
+
+        self._analyze(self._collect_hops(), elapsed)
+
+        records = []
+        for index, meter_id in enumerate(list(self.layout)):
+            meter = self.meters.get(meter_id)
+            if meter is None:
+                continue
+            levels = quantize_db([meter.peak_db, meter.rms_db, meter.lufs])
+            record = RECORD_HEADER.pack(index, *levels.tolist()) + quantize_db(meter.bands_db).tobytes()
+            if record != meter.last_record:
+                meter.last_record = record
+                records.append(record)
+
+        if not records:
+            return None
+
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        header = FRAME_HEADER.pack(FRAME_MAGIC, self.layout_version, self.seq, len(records), NUM_BANDS)
+        return header + b"".join(records)
+
+    def describe(self):
+        """렌더러용 레이아웃 정보 (프레임 해석에 필요)"""
+        return {
+            'version': self.layout_version,
+            'meters': list(self.layout),
+            'bands': [round(float(f), 1) for f in self.analysis.band_edges],
+            'sample_rate': self.sample_rate,
+        }
+
+    def reset_sent(self):
+        """새 구독자가 들어오면 전체 프레임을 다시 보내도록"""
+        for meter in self.meters.values():
+            meter.last_record = None
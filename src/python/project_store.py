@@ -0,0 +1,368 @@
+"""
+AURA Cloud Studio - Project Store
+
+트랙 / 리전 / 스텝 패턴을 버전이 붙은 컴팩트 바이너리 포맷(.aura)으로 저장한다.
+
+파일 구조:
+    [Header]  MAGIC(4) | version(u16) | reserved(u16)
+    [Record]* type(u8) | length(u32) | crc32(u32) | payload
+
+    Record 종류:
+        SNAPSHOT - 프로젝트 전체 (이전 상태를 모두 대체)
+        DELTA    - 직전 저장 이후 바뀐 트랙 / 메타만
+
+    Payload:
+        index_len(u32) | index(JSON) | track blocks...
+        index = {'meta': {...} | None, 'put': {track_id: [offset, length]}, 'delete': [track_id, ...]}
+
+    Track block:
+        info_len(u32) | info(JSON: 스텝 그리드를 뺀 트랙 정보) | num_steps(u16)
+        | active(packbits) | velocity(u8 × steps) | multiplier(u8 × steps)
+
+- 오토세이브는 바뀐 트랙 블록만 DELTA 로 append → 프로젝트가 커져도 쓰기량은 편집량에 비례
+- DELTA 가 쌓이면 SNAPSHOT 하나로 압축(compaction) → 로딩 비용이 편집 이력에 비례하지 않음
+- 로딩은 mmap + 레코드 헤더/인덱스만 읽고, 트랙은 요청될 때 디코딩 (lazy)
+"""
+
+import os
+import json
+import mmap
+import struct
+import zlib
+import hashlib
+import threading
+
+import numpy as np
+
+MAGIC = b"AURP"
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct("<4sHH")
+RECORD_HEADER = struct.Struct("<BII")
+U32 = struct.Struct("<I")
+U16 = struct.Struct("<H")
+
+RECORD_SNAPSHOT = 1
+RECORD_DELTA = 2
+
+# DELTA 가 이 개수를 넘거나, DELTA 총량이 마지막 SNAPSHOT 보다 커지면 compaction
+DEFAULT_COMPACT_EVERY = 50
+
+# StepPattern.velocity (0.0 ~ 1.0) → u8 양자화
+VELOCITY_SCALE = 255
+
+
+class ProjectFormatError(Exception):
+    """손상되었거나 지원하지 않는 프로젝트 파일"""
+
+
+# ============================================
+# Track Block Encoding
+# ============================================
+
+def encode_track(track):
+    """
+    트랙 dict → 바이너리 블록
+
+    track['steps'] 는 렌더러 StepPattern 과 같은 모양 ([{'active', 'velocity', 'multiplier'}, ...])
+    이며 배열 그리드로 저장된다. 나머지 필드는 JSON 으로 저장.
+    """
+    info = {k: v for k, v in track.items() if k != 'steps'}
+    info_bytes = json.dumps(info, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    steps = track.get('steps') or []
+    n = len(steps)
+    active = np.fromiter((bool(s.get('active')) for s in steps), dtype=bool, count=n)
+    velocity = np.fromiter(
+        (round(min(1.0, max(0.0, float(s.get('velocity', 1)))) * VELOCITY_SCALE) for s in steps),
+        dtype=np.uint8, count=n
+    )
+    multiplier = np.fromiter((int(s.get('multiplier', 1)) for s in steps), dtype=np.uint8, count=n)
+
+    return b"".join([
+        U32.pack(len(info_bytes)), info_bytes,
+        U16.pack(n),
+        np.packbits(active).tobytes(),
+        velocity.tobytes(),
+        multiplier.tobytes(),
+    ])
+
+
+def decode_track_grid(buf, offset=0):
+    """
+    트랙 블록 → (info dict, active, velocity, multiplier)
+
+    그리드 배열은 buf(mmap)를 가리키는 view 가 아닌 복사본이다 (파일 교체 후에도 안전).
+    """
+    (info_len,) = U32.unpack_from(buf, offset)
+    offset += U32.size
+    info = json.loads(bytes(buf[offset:offset + info_len]).decode('utf-8'))
+    offset += info_len
+
+    (n,) = U16.unpack_from(buf, offset)
+    offset += U16.size
+    packed_len = (n + 7) // 8
+    active = np.unpackbits(np.frombuffer(buf, dtype=np.uint8, count=packed_len, offset=offset))[:n].astype(bool)
+    offset += packed_len
+    velocity = np.frombuffer(buf, dtype=np.uint8, count=n, offset=offset).copy()
+    offset += n
+    multiplier = np.frombuffer(buf, dtype=np.uint8, count=n, offset=offset).copy()
+    return info, active, velocity, multiplier
+
+
+def decode_track(buf, offset=0):
+    """트랙 블록 → 트랙 dict (encode_track 의 역)"""
+    info, active, velocity, multiplier = decode_track_grid(buf, offset)
+    if len(active):
+        info['steps'] = [
+            {'active': bool(a), 'velocity': round(int(v) / VELOCITY_SCALE, 3), 'multiplier': int(m)}
+            for a, v, m in zip(active, velocity, multiplier)
+        ]
+    return info
+
+
+def _encode_record(record_type, meta, blocks, deletes=()):
+    """(meta, {track_id: block}) → 레코드 바이트"""
+    put = {}
+    offset = 0
+    for track_id, block in blocks.items():
+        put[track_id] = [offset, len(block)]
+        offset += len(block)
+    index = json.dumps(
+        {'meta': meta, 'put': put, 'delete': list(deletes)},
+        ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+
+    payload = b"".join([U32.pack(len(index)), index, *blocks.values()])
+    return RECORD_HEADER.pack(record_type, len(payload), zlib.crc32(payload)) + payload
+
+
+# ============================================
+# Loaded Project (Lazy View)
+# ============================================
+
+class ProjectView:
+    """
+    mmap 위에 올린 프로젝트 읽기 뷰
+
+    트랙 순서 / 메타 / 각 트랙 블록 위치만 들고 있고, 트랙 내용은 track() 호출 시 디코딩한다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.meta = {}
+        self.track_order = []
+        self.delta_count = 0
+        self.delta_bytes = 0
+        self.snapshot_bytes = 0
+        self._locations = {}  # track_id -> (absolute offset, length)
+        self._cache = {}
+
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._mm = b""  # 빈 파일
+        self.valid_length = self._scan()
+
+    def _scan(self):
+        """레코드 헤더와 인덱스만 읽어서 트랙 위치 테이블 구성"""
+        mm = self._mm
+        if len(mm) < HEADER.size:
+            raise ProjectFormatError("File too small")
+        magic, version, _ = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ProjectFormatError("Not an AURA project file")
+        if version > FORMAT_VERSION:
+            raise ProjectFormatError(f"Unsupported project version {version}")
+
+        pos = HEADER.size
+        while pos + RECORD_HEADER.size <= len(mm):
+            record_type, length, crc = RECORD_HEADER.unpack_from(mm, pos)
+            start = pos + RECORD_HEADER.size
+            end = start + length
+            if end > len(mm) or zlib.crc32(mm[start:end]) != crc:
+                # 저장 도중 끊긴 마지막 레코드 → 여기까지만 유효
+                print(f"[AURA-PROJECT] Ignoring truncated record at {pos} in {self.path}")
+                break
+
+            (index_len,) = U32.unpack_from(mm, start)
+            index = json.loads(bytes(mm[start + U32.size:start + U32.size + index_len]).decode('utf-8'))
+            blocks_start = start + U32.size + index_len
+
+            if record_type == RECORD_SNAPSHOT:
+                self._locations.clear()
+                self.track_order = []
+                self.delta_count = 0
+                self.delta_bytes = 0
+                self.snapshot_bytes = length
+            else:
+                self.delta_count += 1
+                self.delta_bytes += length
+
+            if index.get('meta') is not None:
+                self.meta = index['meta']
+                if 'track_order' in self.meta:
+                    self.track_order = list(self.meta['track_order'])
+            for track_id in index.get('delete', []):
+                self._locations.pop(track_id, None)
+            for track_id, (offset, block_len) in index.get('put', {}).items():
+                self._locations[track_id] = (blocks_start + offset, block_len)
+
+            pos = end
+        return pos
+
+    @property
+    def track_ids(self):
+        ordered = [t for t in self.track_order if t in self._locations]
+        return ordered + [t for t in self._locations if t not in ordered]
+
+    def track(self, track_id):
+        """트랙 하나 디코딩 (결과는 캐싱)"""
+        track_id = str(track_id)
+        if track_id not in self._cache:
+            offset, _ = self._locations[track_id]
+            self._cache[track_id] = decode_track(self._mm, offset)
+        return self._cache[track_id]
+
+    def track_block(self, track_id):
+        offset, length = self._locations[str(track_id)]
+        return bytes(self._mm[offset:offset + length])
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+
+# ============================================
+# Project Store (Writer)
+# ============================================
+
+class ProjectStore:
+    """
+    .aura 프로젝트 파일 하나에 대한 저장소
+
+    project dict:
+        {'meta': {...}, 'tracks': [{'id': ..., ..., 'steps': [...]}, ...]}
+
+    Args:
+        path: 프로젝트 파일 경로
+        compact_every: DELTA 가 이만큼 쌓이면 SNAPSHOT 으로 compaction
+    """
+
+    def __init__(self, path, compact_every=DEFAULT_COMPACT_EVERY):
+        self.path = str(path)
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+
+        # 마지막으로 디스크에 쓴 상태 (변경 감지용)
+        self._meta = None
+        self._digests = {}
+        self._delta_count = 0
+        self._delta_bytes = 0
+        self._snapshot_bytes = 0
+
+        if os.path.exists(self.path):
+            self._resume()
+
+    @staticmethod
+    def _digest(block):
+        return hashlib.blake2b(block, digest_size=16).digest()
+
+    @staticmethod
+    def _split(project):
+        """project → (meta, {track_id: block}) - 트랙 순서는 meta 에 기록"""
+        tracks = project.get('tracks', [])
+        blocks = {str(t['id']): encode_track(t) for t in tracks}
+        meta = dict(project.get('meta') or {})
+        meta['track_order'] = list(blocks)
+        return meta, blocks
+
+    def _resume(self):
+        """기존 파일에서 변경 감지 기준선 복원"""
+        view = ProjectView(self.path)
+        try:
+            self._meta = view.meta
+            self._digests = {t: self._digest(view.track_block(t)) for t in view.track_ids}
+            self._delta_count = view.delta_count
+            self._delta_bytes = view.delta_bytes
+            self._snapshot_bytes = view.snapshot_bytes
+            valid_length = view.valid_length
+        finally:
+            view.close()
+
+        # 끊긴 꼬리 레코드 제거 → 이후 append 가 유효한 레코드 뒤에 붙도록
+        if os.path.getsize(self.path) > valid_length:
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_length)
+
+    def save(self, project):
+        """전체 SNAPSHOT 저장 (원자적 교체)"""
+        meta, blocks = self._split(project)
+        with self._lock:
+            return self._write_snapshot(meta, blocks)
+
+    def _write_snapshot(self, meta, blocks):
+        record = _encode_record(RECORD_SNAPSHOT, meta, blocks)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0))
+            f.write(record)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        self._meta = meta
+        self._digests = {t: self._digest(b) for t, b in blocks.items()}
+        self._delta_count = 0
+        self._delta_bytes = 0
+        self._snapshot_bytes = len(record)
+        return {'bytes': len(record), 'changed': len(blocks), 'compacted': True}
+
+    def autosave(self, project):
+        """
+        직전 저장 대비 바뀐 부분만 DELTA 로 append
+
+        Returns:
+            {'bytes': 쓴 바이트, 'changed': 바뀐 트랙 수, 'compacted': SNAPSHOT 여부}
+        """
+        meta, blocks = self._split(project)
+        with self._lock:
+            if self._meta is None:
+                return self._write_snapshot(meta, blocks)
+
+            changed = {
+                t: b for t, b in blocks.items()
+                if self._digests.get(t) != self._digest(b)
+            }
+            deleted = [t for t in self._digests if t not in blocks]
+            meta_changed = meta != self._meta
+
+            if not changed and not deleted and not meta_changed:
+                return {'bytes': 0, 'changed': 0, 'compacted': False}
+
+            if (self._delta_count + 1 >= self.compact_every
+                    or self._delta_bytes > self._snapshot_bytes):
+                return self._write_snapshot(meta, blocks)
+
+            record = _encode_record(
+                RECORD_DELTA, meta if meta_changed else None, changed, deleted
+            )
+            with open(self.path, 'ab') as f:
+                f.write(record)
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._meta = meta
+            for t, b in changed.items():
+                self._digests[t] = self._digest(b)
+            for t in deleted:
+                del self._digests[t]
+            self._delta_count += 1
+            self._delta_bytes += len(record)
+            return {'bytes': len(record), 'changed': len(changed) + len(deleted), 'compacted': False}
+
+    def load(self):
+        """mmap 기반 lazy 뷰 반환 (사용 후 close() 할 것)"""
+        return ProjectView(self.path)
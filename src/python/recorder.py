@@ -0,0 +1,459 @@
+"""
+AURA Cloud Studio - Multitrack Recorder
+
+sounddevice 입력 스트림을 받아 입력 채널마다 take 파일(WAV, float32)로 바로 기록한다.
+브라우저 MediaRecorder → webm 인코딩 → base64 전송 단계가 없다.
+
+- 오디오 콜백은 블록을 lock-free 링버퍼에 복사만 한다 (할당 / 락 / 파일 I/O 없음)
+- writer 스레드가 링버퍼를 비우면서 선할당된 memory-mapped take 파일에 기록
+- 입력 여러 개를 동시에 녹음 (스트림 하나, 입력 채널 → 트랙)
+- 펀치 인/아웃 마커: 마커 위치에서 정확히 샘플 단위로 잘라 리전을 나눈다
+- 드롭아웃 카운터: 드라이버 오버플로 / 링버퍼 포화로 버린 프레임
+  버린 구간은 타임라인에서 건너뛰어 (새 리전) 이후 오디오의 싱크가 밀리지 않게 한다
+- take 메타데이터는 시작 즉시, 파형 피크는 기록되는 대로 렌더러에 전달
+
+Take 파일:
+    44바이트 WAV 헤더 (IEEE float, mono) + float32 샘플.
+    선할당 용량 기준 헤더를 미리 써 두므로 녹음 중 크래시가 나도 파일은 재생 가능하고,
+    종료 시 실제 길이로 자르고 헤더를 고친다.
+"""
+
+import os
+import time
+import struct
+import threading
+from collections import deque
+
+import numpy as np
+import sounddevice as sd
+
+SAMPLE_RATE = 44100
+
+# 링버퍼 길이 (초) - writer 스레드가 파일을 늘리는 동안에도 넘치지 않을 만큼
+RING_SECONDS = 4.0
+
+# take 파일 선할당 / 확장 단위 (초)
+PREALLOC_SECONDS = 120.0
+
+# 파형 피크 1개당 샘플 수 (44.1kHz 에서 약 86 피크/초)
+PEAK_WINDOW = 512
+
+# writer 스레드 폴링 주기 (초)
+WRITER_INTERVAL = 0.01
+
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+BYTES_PER_FRAME = 4
+
+
+def wav_header(sample_rate, num_frames):
+    """mono float32 WAV 헤더 (44 bytes)"""
+    data_bytes = num_frames * BYTES_PER_FRAME
+    return WAV_HEADER.pack(
+        b"RIFF", 36 + data_bytes, b"WAVE",
+        b"fmt ", 16, WAVE_FORMAT_IEEE_FLOAT, 1, sample_rate,
+        sample_rate * BYTES_PER_FRAME, BYTES_PER_FRAME, 32,
+        b"data", data_bytes,
+    )
+
+
+class FrameRing:
+    """
+    다채널 lock-free 링버퍼
+
+    write() 는 오디오 콜백 하나에서만, peek()/advance() 는 writer 스레드 하나에서만 호출한다.
+    카운터는 단조 증가하고 데이터를 다 쓴 뒤에 공개한다.
+    """
+
+    def __init__(self, capacity, channels):
+        self.capacity = capacity
+        self.buffer = np.zeros((capacity, channels), dtype=np.float32)
+        self.written = 0    # 생산자가 쓴 총 프레임 수
+        self.consumed = 0   # 소비자가 처리한 총 프레임 수
+
+    def write(self, block):
+        """블록 전체를 쓰거나, 자리가 없으면 아무것도 쓰지 않고 False"""
+        n = len(block)
+        if self.written - self.consumed + n > self.capacity:
+            return False
+        start = self.written % self.capacity
+        first = min(n, self.capacity - start)
+        self.buffer[start:start + first] = block[:first]
+        self.buffer[:n - first] = block[first:]
+        self.written += n
+        return True
+
+    def peek(self):
+        """읽을 수 있는 구간 (시작 위치, (frames, channels) 배열)"""
+        start, end = self.consumed, self.written
+        offset = start % self.capacity
+        n = end - start
+        if offset + n <= self.capacity:
+            return start, self.buffer[offset:offset + n]
+        return start, np.concatenate([self.buffer[offset:], self.buffer[:offset + n - self.capacity]])
+
+    def advance(self, n):
+        self.consumed += n
+
+
+class Take:
+    """
+    입력 하나의 take 파일 (memory-mapped, 선할당)
+
+    파일은 open() 에서 만든다 (생성자는 디스크를 건드리지 않음).
+
+    Args:
+        take_id: 고유 ID
+        path: WAV 파일 경로
+        track_id: 대상 트랙
+        channel: 입력 채널 인덱스 (0 부터)
+        sample_rate: 샘플레이트
+        prealloc_frames: 선할당 / 확장 단위 (프레임)
+    """
+
+    def __init__(self, take_id, path, track_id, channel, sample_rate, prealloc_frames):
+        self.take_id = take_id
+        self.path = str(path)
+        self.track_id = track_id
+        self.channel = channel
+        self.sample_rate = sample_rate
+        self.prealloc_frames = prealloc_frames
+
+        self.frames = 0      # 파일에 기록된 프레임 수
+        self.regions = []    # [{'start': 타임라인 프레임, 'offset': 파일 내 프레임, 'length'}]
+        self.peaks = bytearray()  # PEAK_WINDOW 마다 |x| 최대값 (u8, 파일 순서)
+        self.peaks_sent = 0
+        self._peak_tail = np.zeros(0, dtype=np.float32)
+
+        self.capacity = 0
+        self.data = None
+
+    def open(self):
+        """take 파일 생성 + 선할당 (Blocking)"""
+        self._resize(self.prealloc_frames)
+
+    def _resize(self, capacity):
+        if self.data is not None:
+            self.data.flush()
+            self.data = None
+        mode = 'r+b' if os.path.exists(self.path) else 'w+b'
+        with open(self.path, mode) as f:
+            f.write(wav_header(self.sample_rate, capacity))
+            f.truncate(WAV_HEADER.size + capacity * BYTES_PER_FRAME)
+        self.capacity = capacity
+        self.data = np.memmap(self.path, dtype=np.float32, mode='r+',
+                              offset=WAV_HEADER.size, shape=(capacity,))
+
+    def append(self, timeline_frame, samples):
+        """타임라인 위치 timeline_frame 부터 이어지는 샘플 기록"""
+        n = len(samples)
+        if not n:
+            return
+        if self.frames + n > self.capacity:
+            grow = -(-(self.frames + n - self.capacity) // self.prealloc_frames)
+            self._resize(self.capacity + grow * self.prealloc_frames)
+
+        region = self.regions[-1] if self.regions else None
+        if region is None or region['start'] + region['length'] != timeline_frame:
+            region = {'start': timeline_frame, 'offset': self.frames, 'length': 0}
+            self.regions.append(region)
+
+        self.data[self.frames:self.frames + n] = samples
+        self.frames += n
+        region['length'] += n
+        self._add_peaks(samples)
+
+    def _add_peaks(self, samples):
+        tail = np.concatenate([self._peak_tail, np.abs(samples)])
+        full = len(tail) // PEAK_WINDOW * PEAK_WINDOW
+        if full:
+            peaks = tail[:full].reshape(-1, PEAK_WINDOW).max(axis=1)
+            self.peaks += np.minimum(peaks * 255, 255).astype(np.uint8).tobytes()
+        self._peak_tail = tail[full:]
+
+    def take_new_peaks(self):
+        """마지막 호출 이후 새로 생긴 피크 (소비자 하나)"""
+        end = len(self.peaks)
+        new = bytes(self.peaks[self.peaks_sent:end])
+        self.peaks_sent = end
+        return new
+
+    def finalize(self):
+        """실제 길이로 자르고 헤더 확정"""
+        if self.data is not None:
+            self.data.flush()
+            self.data = None
+        with open(self.path, 'r+b') as f:
+            f.write(wav_header(self.sample_rate, self.frames))
+            f.truncate(WAV_HEADER.size + self.frames * BYTES_PER_FRAME)
+
+    def discard(self):
+        """녹음이 시작되지 못함 → 파일 삭제"""
+        self.data = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def info(self):
+        return {
+            'id': self.take_id,
+            'track': self.track_id,
+            'channel': self.channel,
+            'path': self.path,
+            'sample_rate': self.sample_rate,
+            'frames': self.frames,
+            'regions': [dict(r) for r in self.regions],
+            'peak_window': PEAK_WINDOW,
+        }
+
+
+class RecordingSession:
+    """
+    입력 스트림 하나 + 입력 채널별 take
+
+    Args:
+        inputs: [{'track': 'vox', 'channel': 0}, ...]
+        directory: take 파일을 만들 폴더
+        sample_rate: 녹음 샘플레이트
+        device: sounddevice 입력 장치 (None = 기본 장치)
+        punch: (in_seconds, out_seconds) - 지정하면 그 구간만 기록 (None 이면 즉시 기록)
+        latency: 입력 스트림 지연 ('low' | 'high' | 초)
+        monitor: monitor(meter_id, samples) - 입력 레벨 미터용 (writer 스레드에서 호출)
+                 meter_id 는 입력 채널 단위 'input:<channel>' (take 의 channel 로 트랙과 연결)
+    """
+
+    def __init__(self, inputs, directory, sample_rate=SAMPLE_RATE, device=None, punch=None,
+                 latency='low', monitor=None):
+        if not inputs:
+            raise ValueError("No inputs to record")
+        now = time.time()
+        self.session_id = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"-{int(now * 1000) % 1000:03d}"
+        self.directory = directory
+        self.sample_rate = int(sample_rate)
+        self.device = device
+        self.latency = latency
+        self.monitor = monitor
+
+        os.makedirs(directory, exist_ok=True)
+        prealloc_frames = int(PREALLOC_SECONDS * self.sample_rate)
+        self.takes = []
+        for index, spec in enumerate(inputs):
+            track_id = str(spec.get('track', index))
+            safe_track = "".join(c for c in track_id if c.isalnum() or c in "_-") or f"input{index}"
+            take_id = f"{self.session_id}-{index}"
+            # 같은 트랙에 입력이 여러 개여도 파일이 겹치지 않도록 take ID 를 파일명에
+            self.takes.append(Take(
+                take_id,
+                os.path.join(directory, f"{safe_track}_{take_id}.wav"),
+                track_id,
+                int(spec.get('channel', index)),
+                self.sample_rate,
+                prealloc_frames,
+            ))
+        self.channels = max(take.channel for take in self.takes) + 1
+        self.monitor_channels = sorted({take.channel for take in self.takes})
+        self.ring = FrameRing(int(RING_SECONDS * self.sample_rate), self.channels)
+
+        # 드롭아웃 (콜백에서 갱신)
+        self.overflows = 0        # 드라이버가 보고한 입력 오버플로 횟수
+        self.dropped_frames = 0   # 링버퍼 포화로 버린 프레임
+        self.gaps = deque()       # (링 위치, 버린 프레임 수) → writer 가 타임라인을 건너뜀
+        self._gap_offset = 0
+
+        # 펀치 인/아웃 (마커는 타임라인 프레임 기준)
+        self.punched = punch is None
+        self._markers = []
+        self._marker_lock = threading.Lock()
+        self.marker_log = []
+        if punch is not None:
+            punch_in, punch_out = punch
+            self.punch('in', punch_in)
+            if punch_out is not None:
+                self.punch('out', punch_out)
+
+        self.stream = None
+        self._stop = threading.Event()
+        self._writer = None
+        self.started_at = None
+
+    # ------------------------------------------------------------------
+    # Audio Thread
+    # ------------------------------------------------------------------
+
+    def _callback(self, indata, frames, time_info, status):
+        # 실시간 스레드: 복사와 카운터 갱신만
+        if status.input_overflow:
+            self.overflows += 1
+        if not self.ring.write(indata):
+            self.gaps.append((self.ring.written, frames))
+            self.dropped_frames += frames
+
+    # ------------------------------------------------------------------
+    # Writer Thread
+    # ------------------------------------------------------------------
+
+    def _pending_markers(self):
+        with self._marker_lock:
+            markers, self._markers = self._markers, []
+        return markers
+
+    def _drain(self, markers):
+        start, block = self.ring.peek()
+        n = len(block)
+        i = 0
+        while i < n:
+            ring_pos = start + i
+            while self.gaps and self.gaps[0][0] <= ring_pos:
+                self._gap_offset += self.gaps.popleft()[1]
+            timeline = ring_pos + self._gap_offset
+
+            while markers and markers[0][0] <= timeline:
+                frame, action = markers.pop(0)
+                if self.punched != (action == 'in'):
+                    self.punched = action == 'in'
+                    self.marker_log.append({'type': action, 'frame': max(frame, timeline)})
+
+            # 다음 드롭 위치 / 마커 위치에서 구간을 나눈다
+            end = n
+            if self.gaps:
+                end = min(end, self.gaps[0][0] - start)
+            if markers:
+                end = min(end, i + markers[0][0] - timeline)
+
+            segment = block[i:end]
+            if self.punched:
+                for take in self.takes:
+                    take.append(timeline, segment[:, take.channel])
+            if self.monitor:
+                # 채널마다 미터 하나 (같은 트랙의 입력 여러 개가 한 링버퍼에 섞이지 않도록)
+                for channel in self.monitor_channels:
+                    self.monitor(f"input:{channel}", segment[:, channel])
+            i = end
+
+        self.ring.advance(n)
+
+    def _run_writer(self):
+        markers = []
+        while True:
+            stopping = self._stop.is_set()
+            new = self._pending_markers()
+            if new:
+                markers = sorted(markers + new)
+            try:
+                self._drain(markers)
+            except Exception as e:
+                print(f"[AURA-REC] Writer error: {e}")
+            if stopping:
+                return
+            self._stop.wait(WRITER_INTERVAL)
+
+    # ------------------------------------------------------------------
+    # Control
+    # ------------------------------------------------------------------
+
+    @property
+    def position(self):
+        """현재까지 캡처된 타임라인 위치 (프레임)"""
+        return self.ring.written + self.dropped_frames
+
+    def punch(self, action, seconds=None):
+        """
+        펀치 인/아웃 마커 추가
+
+        Args:
+            action: 'in' | 'out'
+            seconds: 녹음 시작 기준 위치 (None = 지금)
+        """
+        if action not in ('in', 'out'):
+            raise ValueError(f"Unknown punch action: {action}")
+        frame = self.position if seconds is None else int(seconds * self.sample_rate)
+        with self._marker_lock:
+            self._markers.append((frame, action))
+        return frame
+
+    def start(self):
+        """take 파일 선할당 → 입력 스트림 열기 → writer 시작 (Blocking)"""
+        try:
+            for take in self.takes:
+                take.open()
+            # 장치 / 채널 수가 맞지 않으면 여기서 실패 → writer 를 띄우기 전에 정리
+            self.stream = sd.InputStream(
+                samplerate=self.sample_rate,
+                device=self.device,
+                channels=self.channels,
+                dtype='float32',
+                latency=self.latency,
+                callback=self._callback,
+            )
+            self._writer = threading.Thread(target=self._run_writer, name='aura-rec-writer', daemon=True)
+            self._writer.start()
+            self.stream.start()
+        except BaseException:
+            self._abort()
+            raise
+        self.started_at = time.time()
+        print(f"[AURA-REC] Recording {len(self.takes)} inputs @ {self.sample_rate}Hz "
+              f"(latency {self.stream.latency * 1000:.1f}ms)")
+        return self.describe()
+
+    def _abort(self):
+        """start() 실패 → 스트림 / writer 정리, 빈 take 파일 삭제"""
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        self._stop.set()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        for take in self.takes:
+            take.discard()
+
+    def stop(self):
+        """스트림 종료 → 남은 버퍼 기록 → take 파일 확정 (Blocking)"""
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+        self._stop.set()
+        if self._writer is not None:
+            self._writer.join()
+        for take in self.takes:
+            take.finalize()
+        print(f"[AURA-REC] Stopped ({self.position / self.sample_rate:.1f}s, "
+              f"{self.overflows} overflows, {self.dropped_frames} dropped frames)")
+        return self.describe()
+
+    # ------------------------------------------------------------------
+    # Status
+    # ------------------------------------------------------------------
+
+    def dropouts(self):
+        return {
+            'overflows': self.overflows,
+            'dropped_frames': self.dropped_frames,
+            'buffered_frames': self.ring.written - self.ring.consumed,
+        }
+
+    def describe(self):
+        return {
+            'session': self.session_id,
+            'sample_rate': self.sample_rate,
+            'position': self.position,
+            'punched': self.punched,
+            'markers': list(self.marker_log),
+            'dropouts': self.dropouts(),
+            'takes': [take.info() for take in self.takes],
+        }
+
+    def poll(self):
+        """진행 상황 + 새 피크 (소비자 하나 - 서버의 진행 상황 루프)"""
+        return {
+            'position': self.position,
+            'punched': self.punched,
+            'dropouts': self.dropouts(),
+            'takes': [
+                {'id': take.take_id, 'frames': take.frames, 'peaks': take.take_new_peaks()}
+                for take in self.takes
+            ],
+        }
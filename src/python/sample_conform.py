@@ -0,0 +1,409 @@
+"""
+AURA Cloud Studio - Sample Conform Service
+
+프로젝트 BPM / Key 변경 시 루프와 원샷 샘플을 Pedalboard(Rubber Band)의
+time-stretch / pitch-shift 로 다시 렌더링한다.
+
+- 긴 샘플은 오버랩 청크로 쪼개서 여러 코어에서 병렬 처리
+- 결과는 (원본 해시, 목표 BPM, 반음) 키로 캐싱 (용량 기반 LRU 축출)
+- 템포 변경 직후 "다음에 올 법한" 템포들을 백그라운드에서 미리 계산
+"""
+
+import io
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pedalboard
+from pedalboard.io import AudioFile
+
+# 기본 캐시 용량: 512MB (float32 스테레오 44.1kHz 기준 약 25분 분량)
+DEFAULT_CACHE_BYTES = 512 * 1024 * 1024
+
+# 원본 샘플 레지스트리 용량: 256MB (이를 넘으면 가장 오래 안 쓴 원본부터 축출)
+DEFAULT_SOURCE_BYTES = 256 * 1024 * 1024
+
+# 이 길이보다 긴 샘플만 청크로 나눈다 (짧은 루프는 통째로 처리하는 게 음질/속도 모두 유리)
+DEFAULT_CHUNK_SECONDS = 8.0
+
+# 청크 경계 크로스페이드 길이 (위상 불연속으로 인한 클릭 방지)
+CHUNK_OVERLAP_SECONDS = 0.05
+
+# 템포 변경 시 미리 계산할 후보 (현재 BPM 기준 상대값)
+PREFETCH_BPM_OFFSETS = (1, -1, 2, -2, 5, -5)
+
+
+def hash_audio_bytes(data):
+    """원본 파일 바이트 → 캐시 키용 해시"""
+    return hashlib.sha1(data).hexdigest()
+
+
+def decode_audio(data):
+    """
+    오디오 파일 바이트 디코딩
+
+    Returns:
+        (audio, sample_rate) - audio 는 (channels, frames) float32
+    """
+    with AudioFile(io.BytesIO(data)) as f:
+        audio = f.read(f.frames)
+        sample_rate = f.samplerate
+    return audio.astype(np.float32, copy=False), sample_rate
+
+
+def encode_wav(audio, sample_rate):
+    """(channels, frames) float32 → WAV 바이트"""
+    buf = io.BytesIO()
+    with AudioFile(buf, 'w', sample_rate, audio.shape[0], format='wav') as f:
+        f.write(audio)
+    return buf.getvalue()
+
+
+class ConformCache:
+    """
+    Conform 결과 캐시 (용량 기반 LRU)
+
+    키: (source_hash, source_bpm, target_bpm, semitones)
+    값: (channels, frames) float32 numpy array
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(source_hash, source_bpm, target_bpm, semitones):
+        # 부동소수 오차로 같은 템포가 다른 키가 되지 않도록 반올림
+        # 원본 BPM 도 키에 포함 → BPM 정정 전에 시작된 렌더링 결과가 새 BPM 결과로 쓰이지 않는다
+        return (source_hash, round(float(source_bpm), 2), round(float(target_bpm), 2), round(float(semitones), 2))
+
+    def get(self, key):
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return audio
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key, audio):
+        size = audio.nbytes
+        if size > self.max_bytes:
+            return  # 캐시 전체보다 큰 결과는 저장하지 않음
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old.nbytes
+
+            self._entries[key] = audio
+            self.current_bytes += size
+
+            # 가장 오래 안 쓴 항목부터 축출
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+
+    def discard_source(self, source_hash):
+        """원본 하나의 결과 전부 삭제 (원본 BPM 이 바뀌어 더는 쓰이지 않는 항목)"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == source_hash]:
+                self.current_bytes -= self._entries.pop(key).nbytes
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+class SampleConformer:
+    """
+    Tempo / Pitch Conform 서비스
+
+    Args:
+        executor: 청크 처리를 돌릴 Executor (기본: CPU 코어 수만큼의 ThreadPoolExecutor).
+                  Pedalboard 는 렌더링 중 GIL 을 풀어주므로 스레드만으로 멀티코어를 쓴다.
+        cache_bytes: 캐시 최대 용량 (bytes)
+        source_bytes: 원본 레지스트리 최대 용량 (bytes)
+        chunk_seconds: 청크 분할 기준 길이 (초)
+    """
+
+    def __init__(self, executor=None, cache_bytes=DEFAULT_CACHE_BYTES,
+                 source_bytes=DEFAULT_SOURCE_BYTES, chunk_seconds=DEFAULT_CHUNK_SECONDS):
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 2,
+            thread_name_prefix='aura-conform'
+        )
+        self.cache = ConformCache(cache_bytes)
+        self.chunk_seconds = chunk_seconds
+
+        # 원본 샘플 레지스트리: source_hash -> (audio, sample_rate, source_bpm) (용량 기반 LRU)
+        # 축출된 원본은 클라이언트가 audio 를 다시 보내면 재등록된다
+        self.source_bytes = source_bytes
+        self._sources = OrderedDict()
+        self._sources_current = 0
+        self._sources_lock = threading.Lock()
+
+        # 템포가 바뀔 때마다 증가 → 오래된 prefetch 작업은 스스로 중단
+        self._generation = 0
+
+    # ------------------------------------------------------------------
+    # Source Registry
+    # ------------------------------------------------------------------
+
+    def register_source(self, data, source_bpm):
+        """
+        원본 샘플 등록 (디코딩은 해시당 한 번만)
+
+        이미 등록된 원본이면 source_bpm 만 갱신한다 (원샷 → 루프로 정정 등).
+
+        Returns:
+            source_hash
+        """
+        source_hash = hash_audio_bytes(data)
+        if self.set_source_bpm(source_hash, source_bpm):
+            return source_hash
+
+        audio, sample_rate = decode_audio(data)
+        with self._sources_lock:
+            if source_hash not in self._sources:
+                self._sources[source_hash] = (audio, sample_rate, float(source_bpm))
+                self._sources_current += audio.nbytes
+
+                # 가장 오래 안 쓴 원본부터 축출 (방금 등록한 원본은 남김)
+                while self._sources_current > self.source_bytes and len(self._sources) > 1:
+                    _, (evicted, _, _) = self._sources.popitem(last=False)
+                    self._sources_current -= evicted.nbytes
+        return source_hash
+
+    def set_source_bpm(self, source_hash, source_bpm):
+        """
+        등록된 원본의 BPM 갱신 (바뀌었으면 이전 BPM 기준 캐시 결과 삭제)
+
+        Returns:
+            등록된 원본인지
+        """
+        source_bpm = float(source_bpm)
+        with self._sources_lock:
+            source = self._sources.get(source_hash)
+            if source is None:
+                return False
+            self._sources.move_to_end(source_hash)
+            audio, sample_rate, old_bpm = source
+            if old_bpm == source_bpm:
+                return True
+            self._sources[source_hash] = (audio, sample_rate, source_bpm)
+        self.cache.discard_source(source_hash)
+        return True
+
+    def get_source(self, source_hash):
+        with self._sources_lock:
+            source = self._sources.get(source_hash)
+            if source is not None:
+                self._sources.move_to_end(source_hash)
+            return source
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def _stretch(self, audio, sample_rate, stretch_factor, semitones):
+        """단일 버퍼 렌더링 (Blocking, GIL 해제)"""
+        return pedalboard.time_stretch(
+            audio,
+            sample_rate,
+            stretch_factor=stretch_factor,
+            pitch_shift_in_semitones=semitones,
+        ).astype(np.float32, copy=False)
+
+    def _submit_render(self, audio, sample_rate, stretch_factor, semitones):
+        """
+        렌더링 작업을 Executor 에 제출
+
+        긴 샘플은 앞뒤로 오버랩을 붙인 청크로 쪼개 동시에 처리한다.
+        Executor 에는 말단(leaf) 작업만 올라가므로 워커끼리 서로를 기다리는 데드락이 없다.
+        """
+        frames = audio.shape[1]
+        chunk = int(self.chunk_seconds * sample_rate)
+        if frames <= chunk:
+            return [self.executor.submit(self._stretch, audio, sample_rate, stretch_factor, semitones)]
+
+        overlap = int(CHUNK_OVERLAP_SECONDS * sample_rate)
+        # 오버랩보다 짧은 나머지는 앞 청크에 합친다
+        # (앞 청크의 꼬리 오버랩이 잘리면 크로스페이드가 다른 원본 구간끼리 섞여 길이가 틀어짐)
+        starts = list(range(0, frames - overlap, chunk))
+        ends = [s + chunk + overlap for s in starts[:-1]] + [frames]
+        return [
+            self.executor.submit(
+                self._stretch,
+                audio[:, max(0, s - overlap):end],
+                sample_rate, stretch_factor, semitones
+            )
+            for s, end in zip(starts, ends)
+        ]
+
+    @staticmethod
+    def _assemble(futures, sample_rate, stretch_factor):
+        """청크 결과를 equal-power 크로스페이드로 이어 붙임"""
+        pieces = [f.result() for f in futures]
+        if len(pieces) == 1:
+            return pieces[0]
+
+        # 출력 도메인에서의 오버랩 길이
+        overlap = int(round(CHUNK_OVERLAP_SECONDS * sample_rate / stretch_factor))
+        fade = np.linspace(0.0, np.pi / 2, overlap, dtype=np.float32)
+        fade_in, fade_out = np.sin(fade), np.cos(fade)
+
+        first = pieces[0]
+        out = [first[:, :first.shape[1] - overlap]]
+        tail = first[:, first.shape[1] - overlap:]
+        for i, piece in enumerate(pieces[1:], start=1):
+            # 이전 청크의 꼬리 오버랩 == 현재 청크의 두 번째 오버랩 구간 (같은 원본 구간)
+            head = piece[:, overlap:2 * overlap]
+            n = min(tail.shape[1], head.shape[1])
+            out.append(tail[:, :n] * fade_out[:n] + head[:, :n] * fade_in[:n])
+
+            body_end = piece.shape[1] if i == len(pieces) - 1 else piece.shape[1] - overlap
+            out.append(piece[:, 2 * overlap:body_end])
+            tail = piece[:, body_end:]
+        return np.concatenate(out, axis=1)
+
+    def _plan(self, source_hash, target_bpm, semitones):
+        """
+        캐시 조회 + 필요 시 렌더링 제출
+
+        Returns:
+            (key, sample_rate, cached_audio | None, futures | None, stretch_factor)
+        """
+        source = self.get_source(source_hash)
+        if source is None:
+            raise KeyError(f"Unknown sample source: {source_hash}")
+        audio, sample_rate, source_bpm = source
+
+        key = ConformCache.make_key(source_hash, source_bpm, target_bpm, semitones)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return key, sample_rate, cached, None, 1.0
+
+        if source_bpm <= 0 or abs(target_bpm - source_bpm) < 1e-3:
+            stretch_factor = 1.0  # 원샷(BPM 없음) 또는 동일 템포 → 피치만 처리
+        else:
+            stretch_factor = float(target_bpm) / source_bpm
+
+        if stretch_factor == 1.0 and semitones == 0:
+            return key, sample_rate, audio, None, 1.0
+
+        futures = self._submit_render(audio, sample_rate, stretch_factor, semitones)
+        return key, sample_rate, None, futures, stretch_factor
+
+    def conform(self, source_hash, target_bpm, semitones=0.0):
+        """
+        등록된 샘플을 목표 BPM / 반음으로 Conform (Blocking)
+
+        Returns:
+            (audio, sample_rate, cached)
+        """
+        key, sample_rate, ready, futures, stretch_factor = self._plan(source_hash, target_bpm, semitones)
+        if ready is not None:
+            return ready, sample_rate, True
+
+        result = self._assemble(futures, sample_rate, stretch_factor)
+        self.cache.put(key, result)
+        return result, sample_rate, False
+
+    def conform_many(self, source_hashes, target_bpm, semitones=0.0, on_result=None):
+        """
+        여러 샘플을 병렬로 Conform (Blocking)
+
+        모든 샘플의 렌더링을 먼저 한꺼번에 제출한 뒤, 샘플 단위로 완성되는 대로
+        on_result(source_hash, audio, sample_rate, cached, error) 를 호출한다.
+        30트랙 프로젝트에서도 캐시된 루프는 즉시, 나머지는 끝나는 대로 교체할 수 있다.
+        """
+        self._generation += 1
+
+        pending = []
+        for source_hash in source_hashes:
+            try:
+                key, sample_rate, ready, futures, stretch_factor = self._plan(source_hash, target_bpm, semitones)
+            except Exception as e:
+                print(f"[AURA-CONFORM] Failed {source_hash[:8]}: {e}")
+                if on_result:
+                    on_result(source_hash, None, None, False, e)
+                continue
+
+            if ready is not None:
+                if on_result:
+                    on_result(source_hash, ready, sample_rate, True, None)
+            else:
+                pending.append((source_hash, key, sample_rate, futures, stretch_factor))
+
+        for source_hash, key, sample_rate, futures, stretch_factor in pending:
+            try:
+                result = self._assemble(futures, sample_rate, stretch_factor)
+                self.cache.put(key, result)
+                if on_result:
+                    on_result(source_hash, result, sample_rate, False, None)
+            except Exception as e:
+                print(f"[AURA-CONFORM] Failed {source_hash[:8]}: {e}")
+                if on_result:
+                    on_result(source_hash, None, None, False, e)
+
+    # ------------------------------------------------------------------
+    # Background Prefetch
+    # ------------------------------------------------------------------
+
+    def prefetch(self, source_hashes, current_bpm, semitones=0.0,
+                 offsets=PREFETCH_BPM_OFFSETS):
+        """
+        현재 BPM 주변 템포를 백그라운드에서 미리 렌더링 (Non-blocking)
+
+        후보를 하나씩 순차 렌더링하므로 포그라운드 요청과 Executor 를 나눠 쓸 때도
+        큐를 점령하지 않는다. 새 conform 요청이 들어오면 generation 이 바뀌어
+        남은 후보는 건너뛴다.
+        """
+        generation = self._generation
+        source_hashes = list(source_hashes)
+
+        def run():
+            for offset in offsets:
+                bpm = current_bpm + offset
+                if bpm <= 0:
+                    continue
+                for source_hash in source_hashes:
+                    if generation != self._generation:
+                        return  # 더 최신 템포 요청이 있음 → 포그라운드에 양보
+                    source = self.get_source(source_hash)
+                    if source is None:
+                        continue  # 그 사이 축출됨
+                    if ConformCache.make_key(source_hash, source[2], bpm, semitones) in self.cache:
+                        continue
+                    try:
+                        self.conform(source_hash, bpm, semitones)
+                    except Exception as e:
+                        print(f"[AURA-CONFORM] Prefetch failed ({bpm} BPM): {e}")
+
+        threading.Thread(target=run, name='aura-conform-prefetch', daemon=True).start()
+
+    def stats(self):
+        stats = self.cache.stats()
+        with self._sources_lock:
+            stats['sources'] = len(self._sources)
+            stats['source_bytes'] = self._sources_current
+        return stats
@@ -10,9 +10,10 @@ import os
 import json
 import time
 import socket
+import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 # [Windows Fix] Force UTF-8 for Console Output to prevent 'cp949' errors
 sys.stdout.reconfigure(encoding='utf-8')
@@ -44,9 +45,8 @@ from pedalboard import Reverb, Compressor, Gain, LowpassFilter
 # 프론트엔드 통신
 import socketio
 
-# 비동기 서버
-import eventlet
-eventlet.monkey_patch()
+# 비동기 서버 (asyncio + ASGI)
+import uvicorn
 
 # 데이터 연산
 import numpy as np
@@ -66,20 +66,52 @@ import base64
 import io
 
 # Faster-Whisper (Local, High Quality, Multilingual)
-from faster_whisper import WhisperModel
+from whisper_engine import WhisperEngine, MAX_WORKERS as WHISPER_MAX_WORKERS
 import tempfile
-import eventlet.tpool # Thread pool for blocking AI tasks
 
-# Initialize Whisper Model (CPU Optimized)
-# Uses "base" model (~140MB). 
-# Good balance for i3 CPU. (tiny is faster but dumber, small is slower)
-WHISPER_MODEL_SIZE = "base"
-whisper_model = None
+# Executors (STT / DSP / I/O 스레드 풀) + Event Loop Lag Monitor
+from concurrency import TrackedExecutor, LoopLagMonitor
+
+# Sample Conform (Tempo / Pitch)
+from sample_conform import SampleConformer, encode_wav
+
+# Metering (Peak / RMS / LUFS / Spectrum → 고정 프레임레이트 바이너리 브로드캐스트)
+from meters import MeterBank
+
+# Multitrack Recorder (InputStream → Ring Buffer → Memory-mapped Take Files)
+from recorder import RecordingSession
+
+# Drum Synth (Vectorized, Batch Variations)
+import drum_synth
+
+# Project Store (Binary Snapshot + Delta Autosave)
+from project_store import ProjectStore, ProjectFormatError
+
+# Speculative Chat (Local Draft / Cloud Final 레이스)
+from speculative_chat import SpeculativeChat, POLICIES
+
+# Voice Intent Resolver (LLM 을 거치지 않는 단순 명령)
+from intent_resolver import IntentResolver
+intent_resolver = IntentResolver()
+
+# Initialize Whisper Engine (CPU Optimized, Tiered)
+# 기본 tiny + base 를 함께 올려두고 요청마다 발화 길이 / 대기열 / 지연 예산으로 선택.
+# (tiny 는 빠르지만 덜 정확, base 는 i3급에서도 짧은 명령은 1초 이내)
+WHISPER_TIERS = tuple(t.strip() for t in os.getenv("WHISPER_TIERS", "tiny,base").split(",") if t.strip())
+WHISPER_LATENCY_BUDGET = float(os.getenv("WHISPER_LATENCY_BUDGET", "1.0"))
+WHISPER_AUTOTUNE = os.getenv("WHISPER_AUTOTUNE", "1") != "0"
+whisper_engine = None
 
 try:
-    print(f"[AURA] Loading Faster-Whisper Model ('{WHISPER_MODEL_SIZE}')...")
+    print(f"[AURA] Loading Faster-Whisper Tiers {WHISPER_TIERS}...")
     # compute_type="int8" is standard for CPU
-    whisper_model = WhisperModel(WHISPER_MODEL_SIZE, device="cpu", compute_type="int8")
+    # 스레드 벤치마크(autotune)는 기동을 막지 않도록 서버가 뜬 뒤 stt 풀에서 (on_startup)
+    whisper_engine = WhisperEngine(
+        tiers=WHISPER_TIERS,
+        latency_budget=WHISPER_LATENCY_BUDGET,
+        compute_type="int8",
+        autotune=False
+    )
     print("[AURA] Faster-Whisper Loaded Successfully.")
 except Exception as e:
     print(f"[CRITICAL] Failed to load Faster-Whisper: {e}")
@@ -104,38 +136,128 @@ else:
 ds_client = None
 if deepseek_api_key:
     try:
-        ds_client = OpenAI(api_key=deepseek_api_key, base_url="https://api.deepseek.com")
+        ds_client = AsyncOpenAI(api_key=deepseek_api_key, base_url="https://api.deepseek.com")
         print(f"[OK] DeepSeek API Client Initialized")
     except Exception as e:
         print(f"[ERROR] DeepSeek Client Init Failed: {e}")
 
 
+# Local Ollama Client (async - 응답 대기 중에도 이벤트 루프는 계속 돈다)
+ollama_client = ollama.AsyncClient()
+
+
+# ============================================
+# Executors
+# ============================================
+# 이벤트 루프에서는 모델 / 오디오 연산을 직접 돌리지 않는다.
+# 모든 블로킹 작업은 용도별 풀로 보내고, 풀마다 대기/실행 현황을 engine_stats 로 노출한다.
+#   stt: Whisper 추론 (워커 수 = 오토튠된 num_workers)
+#   dsp: numpy / pedalboard 배치 연산 (Conform 청크, 드럼 블록)
+#   interactive: 짧고 지연에 민감한 연산 (미터 분석, 킥 합성) - 배치 작업 큐 뒤에 밀리지 않도록 분리
+#   io:  디스크 / 오디오 장치 / 다른 풀 작업을 기다리는 조율 작업
+
+CPU_COUNT = os.cpu_count() or 1
+DSP_WORKERS = int(os.getenv("AURA_DSP_WORKERS", str(CPU_COUNT)))
+IO_WORKERS = int(os.getenv("AURA_IO_WORKERS", "4"))
+INTERACTIVE_WORKERS = int(os.getenv("AURA_INTERACTIVE_WORKERS", "2"))
+LOOP_LAG_WARN_MS = float(os.getenv("AURA_LOOP_LAG_WARN_MS", "50"))
+
+# 튜닝 전에 만들어지므로 워커 상한으로 (튜닝 결과 num_workers 가 더 작으면 CTranslate2 안에서 직렬화)
+stt_executor = TrackedExecutor('stt', WHISPER_MAX_WORKERS if whisper_engine else 1)
+dsp_executor = TrackedExecutor('dsp', DSP_WORKERS)
+io_executor = TrackedExecutor('io', IO_WORKERS)
+interactive_executor = TrackedExecutor('interactive', INTERACTIVE_WORKERS)
+executors = (stt_executor, dsp_executor, interactive_executor, io_executor)
+
+loop_monitor = LoopLagMonitor(warn_ms=LOOP_LAG_WARN_MS)
+
+def run_in(executor, fn, *args):
+    """블로킹 함수를 지정한 풀에서 실행하고 결과를 await"""
+    return asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
 # ============================================
 # Socket.IO Server Setup
 # ============================================
 
+whisper_tune_task = None
+
+async def autotune_whisper():
+    """기동 후 Whisper 스레드 벤치마크 - 끝날 때까지는 기본 설정 티어로 요청 처리"""
+    try:
+        await run_in(stt_executor, whisper_engine.autotune)
+    except Exception as e:
+        print(f"[AURA-WHISPER] Autotune failed: {e}")
+
+async def on_startup():
+    global whisper_tune_task
+    loop_monitor.start()
+    print("[AURA] Executors: " + ", ".join(f"{e.name}={e.max_workers}" for e in executors))
+    if whisper_engine and WHISPER_AUTOTUNE:
+        whisper_tune_task = asyncio.create_task(autotune_whisper())
+
+async def on_shutdown():
+    loop_monitor.stop()
+    if recording_session is not None:
+        # 녹음 중 종료 → take 파일을 실제 길이로 확정
+        recording_session.stop()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
+
 # CORS 허용하여 Socket.IO 서버 생성 (10MB Buffer for Audio)
-sio = socketio.Server(cors_allowed_origins='*', max_http_buffer_size=1e7)
-app = socketio.WSGIApp(sio)
+sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*', max_http_buffer_size=1e7)
+app = socketio.ASGIApp(sio, on_startup=on_startup, on_shutdown=on_shutdown)
 
 # Chat History Storage (per session, split by model)
 chat_histories = {}
 
+LOCAL_MODEL = 'qwen2.5:3b'
+CLOUD_MODEL = 'deepseek-chat'
+
+LOCAL_SYSTEM_PROMPT = (
+    "You are 'AURA Local', an intelligent AI assistant inside a DAW. "
+    "IMPORTANT: You MUST answer in **Korean (한국어)** only. "
+    "Do NOT speak Japanese or English. "
+    "Be professional, concise, and helpful for music production. "
+    "If asked about your identity, say you are AURA Local."
+)
+CLOUD_SYSTEM_PROMPT = "You are AURA, a world-class music theorist. Answer in Korean."
+
+def new_histories():
+    return {'local': [], 'cloud': [], 'hybrid': []}
+
 def get_history(sid, source):
     if sid not in chat_histories:
-        chat_histories[sid] = {'local': [], 'cloud': []}
+        chat_histories[sid] = new_histories()
     return chat_histories[sid][source]
 
-def process_local_chat(sid, messages):
-    """Background task for Local Ollama (Qwen 2.5)"""
+async def stream_local(messages):
+    """Ollama 스트리밍 응답 → 텍스트 조각"""
+    async for part in await ollama_client.chat(model=LOCAL_MODEL, messages=messages, stream=True):
+        yield part['message']['content']
+
+async def complete_cloud(messages):
+    """DeepSeek 전체 응답 텍스트"""
+    if not ds_client:
+        raise Exception("DeepSeek API Key missing")
+
+    response = await ds_client.chat.completions.create(
+        model=CLOUD_MODEL,
+        messages=messages,
+        stream=False
+    )
+    return response.choices[0].message.content
+
+async def process_local_chat(sid, messages):
+    """Local Ollama (Qwen 2.5)"""
     try:
-        response = ollama.chat(model='qwen2.5:3b', messages=messages)
+        response = await ollama_client.chat(model=LOCAL_MODEL, messages=messages)
         ai_text = response['message']['content']
         
         # Add to local history
         get_history(sid, 'local').append({'role': 'assistant', 'content': ai_text})
 
-        sio.emit('chat_response', {
+        await sio.emit('chat_response', {
             'source': 'local',
             'status': 'success',
             'message': ai_text
@@ -144,7 +266,7 @@ def process_local_chat(sid, messages):
         
     except Exception as e:
         print(f"[AURA-LOCAL] Error: {e}")
-        sio.emit('chat_response', {
+        await sio.emit('chat_response', {
             'source': 'local',
             'status': 'error',
             'message': f"Local Error: {str(e)}"
@@ -174,28 +296,20 @@ def log_training_data(user_input, ai_response):
     except Exception as e:
         print(f"[LOG ERROR] Failed to save training data: {e}")
 
-def process_cloud_chat(sid, messages):
-    """Background task for Cloud DeepSeek"""
+async def process_cloud_chat(sid, messages):
+    """Cloud DeepSeek"""
     try:
-        if not ds_client:
-            raise Exception("DeepSeek API Key missing")
-
-        response = ds_client.chat.completions.create(
-            model="deepseek-chat",
-            messages=messages,
-            stream=False
-        )
-        ai_text = response.choices[0].message.content
+        ai_text = await complete_cloud(messages)
         
         # [Harvest] Save Data for Future Independence
         # Extract last user message
         user_text = next((m['content'] for m in reversed(messages) if m['role'] == 'user'), "Unknown")
-        log_training_data(user_text, ai_text)
+        await run_in(io_executor, log_training_data, user_text, ai_text)
 
         # Add to cloud history
         get_history(sid, 'cloud').append({'role': 'assistant', 'content': ai_text})
 
-        sio.emit('chat_response', {
+        await sio.emit('chat_response', {
             'source': 'cloud',
             'status': 'success',
             'message': ai_text
@@ -206,14 +320,14 @@ def process_cloud_chat(sid, messages):
         print(f"[CRITICAL API ERROR] Cloud Chat Failed: {e}")
         import traceback
         traceback.print_exc()
-        sio.emit('chat_response', {
+        await sio.emit('chat_response', {
             'source': 'cloud',
             'status': 'error',
             'message': f"Server Error: {str(e)}"
         }, to=sid)
 
 @sio.event
-def chat_local(sid, data):
+async def chat_local(sid, data):
     """Event for Local Model"""
     user_text = data.get('message', '').strip()
     if not user_text: return
@@ -222,20 +336,14 @@ def chat_local(sid, data):
     history.append({'role': 'user', 'content': user_text})
 
     # Prepare Context (System + Recent History)
-    system_prompt = (
-        "You are 'AURA Local', an intelligent AI assistant inside a DAW. "
-        "IMPORTANT: You MUST answer in **Korean (한국어)** only. "
-        "Do NOT speak Japanese or English. "
-        "Be professional, concise, and helpful for music production. "
-        "If asked about your identity, say you are AURA Local."
-    )
-    messages = [{"role": "system", "content": system_prompt}]
+    messages = [{"role": "system", "content": LOCAL_SYSTEM_PROMPT}]
     messages.extend(history[-5:]) # Limit context
 
-    sio.start_background_task(process_local_chat, sid, messages)
+    # 핸들러마다 별도 task 로 실행되므로 그대로 await 해도 다른 이벤트를 막지 않는다
+    await process_local_chat(sid, messages)
 
 @sio.event
-def chat_cloud(sid, data):
+async def chat_cloud(sid, data):
     """Event for Cloud Model"""
     print(f"[AURA] Cloud Chat Request from {sid}")
     user_text = data.get('message', '').strip()
@@ -245,10 +353,83 @@ def chat_cloud(sid, data):
     history.append({'role': 'user', 'content': user_text})
 
     # Prepare Context
-    messages = [{"role": "system", "content": "You are AURA, a world-class music theorist. Answer in Korean."}]
+    messages = [{"role": "system", "content": CLOUD_SYSTEM_PROMPT}]
     messages.extend(history[-5:])
 
-    sio.start_background_task(process_cloud_chat, sid, messages)
+    await process_cloud_chat(sid, messages)
+
+# Hybrid: 로컬 임시 답변을 즉시 스트리밍하고 클라우드 답변으로 교체/확정
+HYBRID_POLICY = os.getenv("AURA_HYBRID_POLICY", "cloud_preferred")
+HYBRID_DEADLINE = float(os.getenv("AURA_HYBRID_DEADLINE", "4.0"))
+
+hybrid_chat = SpeculativeChat(stream_local, complete_cloud, policy=HYBRID_POLICY, deadline=HYBRID_DEADLINE)
+
+@sio.event
+async def chat_hybrid(sid, data):
+    """
+    Event for Hybrid Mode (Local Draft + Cloud Final)
+    Data: { 'message': '...', 'policy': 'first_wins' | 'cloud_preferred', 'deadline': 4.0 }
+    Emits chat_response (source='hybrid'):
+        status 'provisional' → 로컬 임시 답변 스트림 { delta, message }
+        status 'success'     → 최종 답변 { message, winner, replaced, latency }
+    """
+    user_text = data.get('message', '').strip()
+    if not user_text: return
+
+    policy = data.get('policy') or None
+    if policy is not None and policy not in POLICIES:
+        await sio.emit('chat_response', {
+            'source': 'hybrid',
+            'status': 'error',
+            'message': f"Unknown policy: {policy}"
+        }, to=sid)
+        return
+    deadline = data.get('deadline')
+
+    history = get_history(sid, 'hybrid')
+    history.append({'role': 'user', 'content': user_text})
+    recent = history[-5:]
+    messages = {
+        'local': [{"role": "system", "content": LOCAL_SYSTEM_PROMPT}, *recent],
+        'cloud': [{"role": "system", "content": CLOUD_SYSTEM_PROMPT}, *recent],
+    }
+
+    async def emit(stage, payload):
+        if stage == 'draft':
+            await sio.emit('chat_response', {
+                'source': 'hybrid',
+                'status': 'provisional',
+                'delta': payload['delta'],
+                'message': payload['text']
+            }, to=sid)
+        elif stage == 'final':
+            await sio.emit('chat_response', {
+                'source': 'hybrid',
+                'status': 'success',
+                'message': payload['text'],
+                'winner': payload['source'],
+                'replaced': payload['replaced'],
+                'latency': payload['latency']
+            }, to=sid)
+        else:
+            await sio.emit('chat_response', {
+                'source': 'hybrid',
+                'status': 'error',
+                'message': payload['message']
+            }, to=sid)
+
+    winner, ai_text = await hybrid_chat.race(
+        messages, emit, policy=policy,
+        deadline=float(deadline) if deadline is not None else None
+    )
+    if winner is None:
+        return
+
+    print(f"[AURA-HYBRID] {winner} answered {sid}")
+    history.append({'role': 'assistant', 'content': ai_text})
+    if winner == 'cloud':
+        # [Harvest] 클라우드 답변만 학습 데이터로 저장
+        await run_in(io_executor, log_training_data, user_text, ai_text)
 
 
 # ============================================
@@ -371,6 +552,8 @@ def play_kick():
 
     print("[AURA] Playing Kick...")
     sd.play(audio, samplerate=44100)
+    if meter_subscribers:  # 구독자가 없으면 tick 이 안 돌아 클립이 쌓이기만 한다
+        meter_bank.play('master', audio)
     # 비동기 재생 - wait() 호출 안 함 (즉시 반응)
 
 def play_test_sound():
@@ -380,82 +563,560 @@ def play_test_sound():
 
     print("[AURA] Playing sound...")
     sd.play(audio, samplerate=44100)
+    if meter_subscribers:  # 구독자가 없으면 tick 이 안 돌아 클립이 쌓이기만 한다
+        meter_bank.play('master', audio)
     sd.wait()  # 재생 완료까지 대기
     print("[AURA] Sound playback complete!")
 
+# ============================================
+# Sample Conform (BPM / Key 변경 시 루프 재렌더링)
+# ============================================
+
+# 청크 렌더링은 dsp 풀에서, 청크를 기다려 조립하는 conform_many 는 io 풀에서
+# (같은 풀 안에서 작업이 다른 작업을 기다리면 풀이 꽉 찼을 때 교착될 수 있다)
+conformer = SampleConformer(executor=dsp_executor)
+
+async def process_conform(sid, samples, target_bpm, semitones):
+    """샘플 등록(디코딩) → Conform → 완성되는 대로 전송"""
+    loop = asyncio.get_running_loop()
+    ids_by_hash = {}
+    for sample in samples:
+        source_hash = sample.get('hash')
+        try:
+            if sample.get('audio'):
+                audio_bytes = base64.b64decode(sample['audio'])
+                source_hash = await run_in(
+                    dsp_executor, conformer.register_source, audio_bytes, sample.get('bpm', 0))
+            elif not source_hash or conformer.get_source(source_hash) is None:
+                raise KeyError("Sample not registered. Send audio data.")
+            elif 'bpm' in sample:
+                # 해시만 보내면서 원본 BPM 을 정정한 경우
+                conformer.set_source_bpm(source_hash, sample.get('bpm') or 0)
+        except Exception as e:
+            await sio.emit('conform_result', {
+                'id': sample.get('id'),
+                'success': False,
+                'message': str(e)
+            }, to=sid)
+            continue
+        ids_by_hash.setdefault(source_hash, []).append(sample.get('id'))
+
+    start_time = time.time()
+
+    def on_result(source_hash, audio, sample_rate, cached, error):
+        # io 풀 스레드에서 호출됨 → WAV 인코딩은 여기서 하고 전송만 루프로 넘긴다
+        for sample_id in ids_by_hash.get(source_hash, []):
+            if error:
+                payload = {
+                    'id': sample_id,
+                    'success': False,
+                    'message': str(error)
+                }
+            else:
+                payload = {
+                    'id': sample_id,
+                    'success': True,
+                    'hash': source_hash,
+                    'bpm': target_bpm,
+                    'semitones': semitones,
+                    'cached': cached,
+                    'sample_rate': sample_rate,
+                    'audio': base64.b64encode(encode_wav(audio, sample_rate)).decode('ascii')
+                }
+            asyncio.run_coroutine_threadsafe(sio.emit('conform_result', payload, to=sid), loop)
+
+    await run_in(io_executor, conformer.conform_many, list(ids_by_hash), target_bpm, semitones, on_result)
+    print(f"[AURA-CONFORM] {len(samples)} samples → {target_bpm} BPM ({time.time() - start_time:.2f}s)")
+
+    await sio.emit('conform_complete', {
+        'bpm': target_bpm,
+        'semitones': semitones,
+        'stats': conformer.stats()
+    }, to=sid)
+
+    # 다음에 올 법한 템포를 미리 렌더링
+    conformer.prefetch(list(ids_by_hash), target_bpm, semitones)
+
+@sio.event
+async def conform_samples(sid, data):
+    """
+    샘플 Tempo / Pitch Conform
+    Data: {
+        'target_bpm': 128, 'semitones': 0,
+        'samples': [{ 'id': ..., 'hash': ... } | { 'id': ..., 'audio': 'base64', 'bpm': 120 }]
+    }
+    처음 보내는 샘플은 audio(+원본 bpm, 원샷은 0)를 포함하고, 이후에는 응답으로 받은 hash 만 보내면 된다.
+    """
+    try:
+        target_bpm = float(data.get('target_bpm', 0))
+        semitones = float(data.get('semitones', 0))
+        if target_bpm <= 0:
+            raise ValueError("target_bpm must be positive")
+
+        samples = data.get('samples', [])
+        await process_conform(sid, samples, target_bpm, semitones)
+
+    except Exception as e:
+        print(f"[AURA-CONFORM] Error: {e}")
+        await sio.emit('conform_complete', {
+            'success': False,
+            'message': str(e)
+        }, to=sid)
+
+# ============================================
+# Metering
+# ============================================
+
+METER_FPS = 30  # UI 갱신 주기 (프레임 / 초)
+METER_ROOM = 'meters'
+
+meter_bank = MeterBank(sample_rate=44100)
+meter_bank.ensure('master')
+meter_subscribers = set()
+meter_task = None
+
+async def meter_loop():
+    """tick 마다 바뀐 미터만 담은 바이너리 프레임 하나를 브로드캐스트"""
+    global meter_task
+    loop = asyncio.get_running_loop()
+    interval = 1.0 / METER_FPS
+    layout_version = meter_bank.layout_version
+    next_tick = loop.time()
+
+    try:
+        while meter_subscribers:
+            # 분석(FFT)은 interactive 풀에서 → 이벤트 루프는 다른 클라이언트 처리 계속,
+            # Conform 배치가 dsp 풀을 채우고 있어도 미터는 밀리지 않는다
+            frame = await run_in(interactive_executor, meter_bank.tick)
+
+            if meter_bank.layout_version != layout_version:
+                layout_version = meter_bank.layout_version
+                await sio.emit('meter_layout', meter_bank.describe(), room=METER_ROOM)
+            if frame:
+                await sio.emit('meter_frame', frame, room=METER_ROOM)
+
+            # 처리 시간과 무관하게 고정 주기 유지 (밀렸으면 다음 tick 으로 건너뜀)
+            next_tick += interval
+            now = loop.time()
+            if next_tick < now:
+                next_tick = now
+            await asyncio.sleep(next_tick - now)
+    finally:
+        meter_task = None
+
+@sio.event
+async def meter_subscribe(sid, data=None):
+    """미터 구독 - 레이아웃을 먼저 보내고 프레임 스트림 시작"""
+    global meter_task
+    await sio.enter_room(sid, METER_ROOM)
+    meter_subscribers.add(sid)
+    meter_bank.reset_sent()  # 새 구독자에게 전체 상태 한 번 전송
+    await sio.emit('meter_layout', meter_bank.describe(), to=sid)
+
+    if meter_task is None:
+        meter_task = asyncio.create_task(meter_loop())
+
+@sio.event
+async def meter_unsubscribe(sid, data=None):
+    await sio.leave_room(sid, METER_ROOM)
+    meter_subscribers.discard(sid)
+
+# ============================================
+# Multitrack Recording
+# ============================================
+
+RECORDINGS_DIR = root_path / "recordings"
+RECORD_PROGRESS_FPS = 10  # 피크 / 드롭아웃 전송 주기
+RECORD_ROOM = 'recording'
+
+recording_session = None
+record_task = None
+# record_start 는 io 풀을 두 번 기다린다 → 그 사이 다른 record_start 가 끼어들지 못하게 직렬화
+record_lock = asyncio.Lock()
+
+async def record_progress_loop(session):
+    """녹음 중 새 피크와 드롭아웃 카운터를 주기적으로 전송"""
+    interval = 1.0 / RECORD_PROGRESS_FPS
+    while recording_session is session:
+        await sio.emit('record_progress', session.poll(), room=RECORD_ROOM)
+        await asyncio.sleep(interval)
+
+@sio.event
+async def record_start(sid, data):
+    """
+    녹음 시작
+    Data: {
+        'inputs': [{ 'track': 'vox', 'channel': 0 }, ...],
+        'device': null, 'sample_rate': 44100,
+        'punch': { 'in': 4.0, 'out': 12.0 }  (생략 시 즉시 기록)
+    }
+    take 메타데이터(record_started)는 바로, 피크는 record_progress 로 계속 전달
+    """
+    global recording_session, record_task
+    try:
+        if record_lock.locked() or recording_session is not None:
+            raise RuntimeError("Recording already in progress")
+
+        # 첫 await 전에 자리를 잡는다 (실패하면 lock 해제 → 다음 record_start 가능)
+        async with record_lock:
+            punch = data.get('punch')
+            # 세션 생성(디렉터리 준비) / 스트림 열기 / 파일 선할당은 모두 io 풀에서
+            session = await run_in(io_executor, lambda: RecordingSession(
+                data.get('inputs') or [{'track': 'input', 'channel': 0}],
+                RECORDINGS_DIR,
+                sample_rate=int(data.get('sample_rate', 44100)),
+                device=data.get('device'),
+                punch=(float(punch.get('in', 0)), punch.get('out')) if punch else None,
+                monitor=meter_bank.push
+            ))
+            info = await run_in(io_executor, session.start)
+            recording_session = session
+
+        await sio.enter_room(sid, RECORD_ROOM)
+        await sio.emit('record_started', {'success': True, **info}, room=RECORD_ROOM)
+        record_task = asyncio.create_task(record_progress_loop(session))
+
+    except Exception as e:
+        print(f"[AURA-REC] Start Error: {e}")
+        await sio.emit('record_started', {'success': False, 'message': str(e)}, to=sid)
+
+@sio.event
+async def record_punch(sid, data):
+    """
+    펀치 인/아웃
+    Data: { 'action': 'in' | 'out', 'time': 8.5 }  (time 생략 시 지금)
+    """
+    try:
+        if recording_session is None:
+            raise RuntimeError("Not recording")
+        seconds = data.get('time')
+        frame = recording_session.punch(data.get('action'), float(seconds) if seconds is not None else None)
+        await sio.emit('record_punched', {
+            'success': True,
+            'action': data.get('action'),
+            'frame': frame
+        }, room=RECORD_ROOM)
+
+    except Exception as e:
+        await sio.emit('record_punched', {'success': False, 'message': str(e)}, to=sid)
+
+@sio.event
+async def record_stop(sid, data=None):
+    """녹음 종료 - 남은 버퍼 기록 후 확정된 take 메타데이터 전송"""
+    global recording_session, record_task
+    session = recording_session
+    if session is None:
+        await sio.emit('record_stopped', {'success': False, 'message': 'Not recording'}, to=sid)
+        return
+
+    recording_session = None
+    if record_task is not None:
+        await record_task
+        record_task = None
+
+    try:
+        info = await run_in(io_executor, session.stop)
+        # 마지막 폴링 이후 남은 피크
+        await sio.emit('record_progress', session.poll(), room=RECORD_ROOM)
+        await sio.emit('record_stopped', {'success': True, **info}, room=RECORD_ROOM)
+
+    except Exception as e:
+        print(f"[AURA-REC] Stop Error: {e}")
+        await sio.emit('record_stopped', {'success': False, 'message': str(e)}, room=RECORD_ROOM)
+
+@sio.event
+async def record_devices(sid, data=None):
+    """입력 장치 목록"""
+    devices = [
+        {'index': index, 'name': d['name'], 'channels': d['max_input_channels'],
+         'sample_rate': d['default_samplerate']}
+        for index, d in enumerate(sd.query_devices()) if d['max_input_channels'] > 0
+    ]
+    await sio.emit('record_devices', {'devices': devices}, to=sid)
+
+# ============================================
+# Drum Kit Rendering (Kit Morph / A-B Audition)
+# ============================================
+
+def build_drum_kits(data):
+    """요청 → 후보 킷 목록 (모르는 보이스 / 잘못된 숫자는 ValueError)"""
+    if data.get('morph'):
+        morph = data['morph']
+        return drum_synth.morph_kits(morph.get('from', {}), morph.get('to', {}), int(morph.get('steps', 8)))
+    if data.get('variations'):
+        spec = data['variations']
+        return drum_synth.random_variations(
+            spec.get('base') or {v: {} for v in drum_synth.VOICES},
+            int(spec.get('count', 16)),
+            float(spec.get('amount', 0.2)),
+            spec.get('seed')
+        )
+    return data.get('kits') or []
+
+async def process_drum_kits(sid, data):
+    """후보 킷 전체를 보이스별 배치로 렌더링 후 킷 단위로 전송 (끝나면 drum_kits_complete)"""
+    try:
+        sample_rate = int(data.get('sample_rate', drum_synth.SAMPLE_RATE))
+        kits = build_drum_kits(data)
+        start_time = time.time()
+        # 행 블록은 dsp 풀에서 병렬로, 블록을 기다리는 render_kits 는 io 풀에서
+        rendered = await run_in(io_executor, drum_synth.render_kits, kits, sample_rate, dsp_executor)
+        duration = time.time() - start_time
+        print(f"[AURA-DRUMS] Rendered {len(kits)} kits ({duration * 1000:.1f}ms)")
+
+        # 보이스별 배치 → 킷별 16-bit PCM (바이너리 첨부로 전송)
+        voices_by_kit = [{} for _ in kits]
+        for voice, (audio, indices) in rendered.items():
+            pcm = (audio * 32767).astype(np.int16)
+            for row, kit_index in enumerate(indices):
+                voices_by_kit[kit_index][voice] = pcm[row].tobytes()
+
+        for index, voices in enumerate(voices_by_kit):
+            await sio.emit('drum_kit_rendered', {
+                'index': index,
+                'total': len(kits),
+                'sample_rate': sample_rate,
+                'kit': kits[index],
+                'voices': voices
+            }, to=sid)
+
+        await sio.emit('drum_kits_complete', {
+            'success': True,
+            'total': len(kits),
+            'duration': round(duration, 3)
+        }, to=sid)
+
+    except Exception as e:
+        print(f"[AURA-DRUMS] Error: {e}")
+        await sio.emit('drum_kits_complete', {'success': False, 'message': str(e)}, to=sid)
+
+@sio.event
+async def render_drum_kits(sid, data):
+    """
+    드럼 킷 후보 일괄 렌더링
+    Data (셋 중 하나):
+        { 'kits': [{ 'kick': {...}, 'snare': {...} }, ...] }
+        { 'morph': { 'from': {...}, 'to': {...}, 'steps': 8 } }
+        { 'variations': { 'base': {...}, 'count': 24, 'amount': 0.2, 'seed': 1 } }
+    킷마다 drum_kit_rendered, 마지막에 drum_kits_complete (실패 시 success=False)
+    """
+    await process_drum_kits(sid, data or {})
+
+# ============================================
+# Project Save / Load
+# ============================================
+
+PROJECTS_DIR = root_path / "projects"
+project_stores = {}  # name -> ProjectStore
+project_views = {}   # name -> ProjectView (lazy 로딩 중인 mmap 뷰)
+project_locks = {}   # name -> asyncio.Lock
+
+def project_name(name):
+    # 파일명으로 쓸 수 없는 문자 제거 (경로 탈출 방지)
+    return "".join(c for c in name if c.isalnum() or c in " _-").strip() or "untitled"
+
+def project_lock(name):
+    """
+    프로젝트별 저장 / 열기 / 트랙 읽기 직렬화
+    (풀 스레드가 mmap 뷰를 디코딩하는 중에 뷰를 닫으면 BufferError)
+    """
+    return project_locks.setdefault(name, asyncio.Lock())
+
+def get_project_store(name):
+    """
+    이름별 ProjectStore (처음 열 때 기존 파일 복구/검증 → io 풀에서 호출)
+
+    같은 이름은 project_lock 안에서만 호출되므로 중복 생성 경합 없음.
+    """
+    if name not in project_stores:
+        PROJECTS_DIR.mkdir(parents=True, exist_ok=True)
+        project_stores[name] = ProjectStore(PROJECTS_DIR / f"{name}.aura")
+    return project_stores[name]
+
+def close_project_view(name):
+    # 파일 교체(compaction) 전에 mmap 을 닫아야 함 (Windows 는 매핑된 파일을 교체할 수 없음)
+    view = project_views.pop(name, None)
+    if view:
+        view.close()
+
+async def process_project_save(sid, name, project, full):
+    """저장은 io 풀에서 (대형 프로젝트 오토세이브 중 UI 끊김 방지)"""
+    try:
+        # 기존 파일이 비었거나 깨졌으면 여기서 ProjectFormatError → 클라이언트에 에러 전달
+        store = await run_in(io_executor, get_project_store, name)
+        start_time = time.time()
+        if full:
+            close_project_view(name)
+            result = await run_in(io_executor, store.save, project)
+        else:
+            result = await run_in(io_executor, store.autosave, project)
+            if result['compacted']:
+                close_project_view(name)
+        duration = time.time() - start_time
+
+        if result['bytes']:
+            print(f"[AURA-PROJECT] Saved '{name}' ({result['bytes']} bytes, "
+                  f"{result['changed']} changed, compacted={result['compacted']}, {duration * 1000:.1f}ms)")
+        await sio.emit('project_saved', {'success': True, 'name': name, **result}, to=sid)
+
+    except Exception as e:
+        print(f"[AURA-PROJECT] Save Error: {e}")
+        await sio.emit('project_saved', {'success': False, 'name': name, 'message': str(e)}, to=sid)
+
+@sio.event
+async def project_save(sid, data):
+    """
+    프로젝트 저장
+    Data: { 'name': 'My Song', 'project': { 'meta': {...}, 'tracks': [...] }, 'full': false }
+    full=false (오토세이브) 이면 바뀐 트랙만 delta 로 기록
+    """
+    name = project_name(data.get('name', ''))
+    async with project_lock(name):
+        await process_project_save(sid, name, data.get('project') or {}, bool(data.get('full')))
+
+@sio.event
+async def project_load(sid, data):
+    """
+    프로젝트 열기 - 메타와 트랙 목록만 먼저 전달, 트랙 내용은 project_get_tracks 로 필요할 때 요청
+    Data: { 'name': 'My Song' }
+    """
+    name = project_name(data.get('name', ''))
+    try:
+        async with project_lock(name):
+            store = await run_in(io_executor, get_project_store, name)
+            close_project_view(name)
+            view = await run_in(io_executor, store.load)
+            project_views[name] = view
+
+        await sio.emit('project_loaded', {
+            'success': True,
+            'name': name,
+            'meta': view.meta,
+            'track_ids': view.track_ids
+        }, to=sid)
+
+    except (FileNotFoundError, ProjectFormatError) as e:
+        await sio.emit('project_loaded', {'success': False, 'message': str(e)}, to=sid)
+    except Exception as e:
+        print(f"[AURA-PROJECT] Open Error: {e}")
+        await sio.emit('project_loaded', {'success': False, 'message': str(e)}, to=sid)
+
+@sio.event
+async def project_get_tracks(sid, data):
+    """
+    열린 프로젝트의 트랙 materialize
+    Data: { 'name': 'My Song', 'ids': [...] }  (ids 생략 시 전체)
+    """
+    try:
+        name = project_name(data.get('name', ''))
+        async with project_lock(name):
+            view = project_views.get(name)
+            if view is None:
+                raise KeyError(f"Project '{name}' is not open")
+
+            ids = data.get('ids') or view.track_ids
+            tracks = await run_in(io_executor, lambda: [view.track(t) for t in ids])
+        await sio.emit('project_tracks', {'success': True, 'name': name, 'tracks': tracks}, to=sid)
+
+    except Exception as e:
+        print(f"[AURA-PROJECT] Load Error: {e}")
+        await sio.emit('project_tracks', {'success': False, 'message': str(e)}, to=sid)
+
+# ============================================
+# Engine Stats (Loop Lag / Executor Queues)
+# ============================================
+
+@sio.event
+async def engine_stats(sid, data=None):
+    """이벤트 루프 지연 + 풀별 대기/실행 현황 (동시성 튜닝용)"""
+    await sio.emit('engine_stats', {
+        'loop': loop_monitor.stats(),
+        'executors': [executor.stats() for executor in executors],
+        'whisper': whisper_engine.stats() if whisper_engine else None,
+        'conform': conformer.stats(),
+        'hybrid_chat': hybrid_chat.stats()
+    }, to=sid)
+
 # ============================================
 # Socket.IO Event Handlers
 # ============================================
 
 @sio.event
-def connect(sid, environ):
+async def connect(sid, environ):
     """클라이언트 연결"""
     print(f"[AURA] Client connected: {sid}")
-    chat_histories[sid] = {'local': [], 'cloud': []}  # Initialize split history
-    sio.emit('engine_status', {'status': 'ready', 'message': 'AURA Engine Ready'}, to=sid)
+    chat_histories[sid] = new_histories()  # Initialize split history
+    await sio.emit('engine_status', {'status': 'ready', 'message': 'AURA Engine Ready'}, to=sid)
 
 @sio.event
-def disconnect(sid):
+async def disconnect(sid):
     """클라이언트 연결 해제"""
     print(f"[AURA] Client disconnected: {sid}")
     if sid in chat_histories:
         del chat_histories[sid]  # Clean up history
+    meter_subscribers.discard(sid)
+
+def log_playback_error(future):
+    """기다리지 않는 재생 작업의 예외를 로그로 (안 보면 조용히 사라짐)"""
+    if not future.cancelled() and future.exception() is not None:
+        print(f"[AURA] Error playing sound: {future.exception()}")
 
 @sio.event
-def test_sound(sid, data=None):
+async def test_sound(sid, data=None):
     """엔진 테스트 - 440Hz Sine Wave 재생"""
     print(f"[AURA] Received test_sound request from {sid}")
 
     try:
-        # 비동기로 사운드 재생 (메인 스레드 블로킹 방지)
-        eventlet.spawn(play_test_sound)
-        sio.emit('test_sound_response', {
+        # 재생 완료(sd.wait)까지 블로킹되므로 io 풀에서 (응답은 바로 보냄, 재생 중 에러는 로그로)
+        run_in(io_executor, play_test_sound).add_done_callback(log_playback_error)
+        await sio.emit('test_sound_response', {
             'success': True,
             'message': 'Playing 440Hz test tone...'
         }, to=sid)
     except Exception as e:
         print(f"[AURA] Error playing sound: {e}")
-        sio.emit('test_sound_response', {
+        await sio.emit('test_sound_response', {
             'success': False,
             'message': str(e)
         }, to=sid)
 
 @sio.event
-def ping(sid, data=None):
+async def ping(sid, data=None):
     """연결 테스트"""
     print(f"[AURA] Ping from {sid}")
-    sio.emit('pong', {'message': 'AURA Engine is alive!'}, to=sid)
+    await sio.emit('pong', {'message': 'AURA Engine is alive!'}, to=sid)
 
 
 @sio.event
-def trigger_kick(sid, data=None):
+async def trigger_kick(sid, data=None):
     """Kick Drum 트리거 - 프론트엔드에서 호출"""
     print(f"[AURA] Kick triggered from {sid}")
 
     try:
-        # 직접 호출 (eventlet.spawn이 sounddevice와 충돌 가능)
-        play_kick()
-        sio.emit('trigger_kick_response', {
+        # 합성(pedalboard)은 interactive 풀에서 - 이벤트 루프에서 돌리면 모든 클라이언트의 heartbeat 가 밀리고,
+        # dsp 풀에서 돌리면 대기 중인 Conform 청크 뒤에 줄을 선다
+        await run_in(interactive_executor, play_kick)
+        await sio.emit('trigger_kick_response', {
             'success': True,
             'message': 'Kick!'
         }, to=sid)
     except Exception as e:
         print(f"[AURA] Error playing kick: {e}")
-        sio.emit('trigger_kick_response', {
+        await sio.emit('trigger_kick_response', {
             'success': False,
             'message': str(e)
         }, to=sid)
 
-def transcribe_audio_file(file_path):
+def transcribe_audio_file(file_path, queue_depth=0):
     """Blocking function to run in thread pool"""
     # [Magic Fix] initial_prompt guides Whisper to expect Korean/English commands.
     # This prevents hallucinations (Arabic/Urdu) on short audio.
-    segments, info = whisper_model.transcribe(
-        file_path, 
+    text, info, tier = whisper_engine.transcribe(
+        file_path,
+        queue_depth=queue_depth,
         beam_size=5,
         initial_prompt="AURA 음성 명령입니다. 한국어와 영어를 섞어서 사용합니다. 재생, 멈춰, Play, Stop, 드럼, 비트."
     )
-    text = " ".join([segment.text for segment in segments]).strip()
 
     # [CTO Fix] Hallucination Filter (Known Whisper Bugs)
     HALLUCINATIONS = [
@@ -465,20 +1126,20 @@ def transcribe_audio_file(file_path):
     for h in HALLUCINATIONS:
         if h.lower() in text.lower():
             print(f"[AURA-WHISPER] Ignored Hallucination: '{text}'")
-            return "", info.language
+            return "", info.language, tier
 
-    return text, info.language
+    return text, info.language, tier
 
 @sio.event
-def recognize_audio(sid, data):
+async def recognize_audio(sid, data):
     """
     STT with Faster-Whisper (Multilingual)
     Data: { 'audio': 'base64_encoded_wav_string' }
     """
     print(f"[AURA] Audio recognition request from {sid}")
     
-    if not whisper_model:
-        sio.emit('recognition_result', {
+    if not whisper_engine:
+        await sio.emit('recognition_result', {
             'success': False,
             'error': 'model_missing',
             'message': 'Whisper Model not loaded.'
@@ -498,24 +1159,34 @@ def recognize_audio(sid, data):
             temp_path = temp_wav.name
 
         try:
-            # Run Inference in Thread Pool (Avoid blocking Eventlet Loop)
-            # This is crucial for performance stability
+            # Run Inference in STT Pool (Avoid blocking the Event Loop)
+            # 이 요청 앞에 처리/대기 중인 요청 수 → 티어 라우팅 입력
             start_time = time.time()
-            text, lang = eventlet.tpool.execute(transcribe_audio_file, temp_path)
+            queue_depth = stt_executor.pending
+            text, lang, tier = await run_in(stt_executor, transcribe_audio_file, temp_path, queue_depth)
             duration = time.time() - start_time
             
-            print(f"[AURA-WHISPER] Recognized ({lang}, {duration:.2f}s): '{text}'")
+            print(f"[AURA-WHISPER] Recognized ({lang}, {tier}, {duration:.2f}s): '{text}'")
             
             if text:
-                sio.emit('recognition_result', {
+                # [Fast Path] 단순 명령은 여기서 바로 구조화 → 렌더러가 LLM 없이 즉시 실행
+                command = intent_resolver.resolve(text)
+                if command:
+                    print(f"[AURA-INTENT] {command['intent']} {command['args']} (score {command['score']})")
+
+                await sio.emit('recognition_result', {
                     'success': True,
-                    'text': text.strip()
+                    'text': text.strip(),
+                    'command': command,
+                    'model': tier,
+                    'latency': round(duration, 3)
                 }, to=sid)
             else:
-                sio.emit('recognition_result', {
+                await sio.emit('recognition_result', {
                     'success': False,
                     'error': 'no_speech',
-                    'message': '음성이 감지되지 않았습니다.'
+                    'message': '음성이 감지되지 않았습니다.',
+                    'model': tier
                 }, to=sid)
 
         finally:
@@ -527,7 +1198,7 @@ def recognize_audio(sid, data):
         print(f"[AURA-WHISPER] Error: {e}")
         import traceback
         traceback.print_exc()
-        sio.emit('recognition_result', {
+        await sio.emit('recognition_result', {
             'success': False,
             'error': 'server_error',
             'message': str(e)
@@ -543,7 +1214,7 @@ if __name__ == '__main__':
     print("=" * 50)
     print(f"[OK] pedalboard:      {pedalboard.__version__}")
     print(f"[OK] python-socketio: loaded")
-    print(f"[OK] eventlet:        loaded")
+    print(f"[OK] uvicorn:         {uvicorn.__version__}")
     print(f"[OK] numpy:           {np.__version__}")
     print(f"[OK] sounddevice:     {sd.__version__}")
     print(f"[OK] python-rtmidi:   loaded")
@@ -558,8 +1229,8 @@ if __name__ == '__main__':
         sys.exit(1)
 
     try:
-        # eventlet WSGI 서버 실행
-        eventlet.wsgi.server(eventlet.listen(('0.0.0.0', 5000)), app)
+        # ASGI 서버 실행 (uvicorn, asyncio 이벤트 루프)
+        uvicorn.run(app, host='0.0.0.0', port=5000, log_level='warning')
     except Exception as e:
         print(f"\n[CRITICAL] Server crashed: {e}")
         sys.exit(1)
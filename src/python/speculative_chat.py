@@ -0,0 +1,236 @@
+"""
+AURA Cloud Studio - Speculative Chat (Local Draft / Cloud Final)
+
+로컬 모델(Ollama)과 클라우드 모델(DeepSeek)을 동시에 돌린다.
+
+- 로컬 응답은 토큰이 나오는 대로 '임시 답변(draft)'으로 바로 흘려보낸다
+- 클라우드 응답이 도착하면 임시 답변을 교체하거나 확정한다
+- 승자가 정해지면 (답변이 쓸 만할 때만) 남은 쪽은 취소한다
+
+체감 응답 시간 = 둘 중 빠른 쪽. 사용자가 어느 백엔드를 골랐는지와 무관해진다.
+
+Policies:
+    first_wins:      먼저 끝난 쓸 만한 답변이 승자
+    cloud_preferred: 클라우드 우선. 마감(deadline) 안에 클라우드가 안 오면 로컬로 확정
+"""
+
+import asyncio
+from collections import deque
+
+import numpy as np
+
+POLICY_FIRST_WINS = 'first_wins'
+POLICY_CLOUD_PREFERRED = 'cloud_preferred'
+POLICIES = (POLICY_FIRST_WINS, POLICY_CLOUD_PREFERRED)
+
+# cloud_preferred 에서 로컬 답변이 준비된 뒤 클라우드를 기다리는 한도 (요청 시작 기준, 초)
+DEFAULT_DEADLINE = 4.0
+
+# 이보다 짧은 답변은 승자로 인정하지 않는다 (빈 응답 / 잘린 응답)
+DEFAULT_MIN_CHARS = 2
+
+# 통계 샘플 보관 개수
+STATS_HISTORY = 200
+
+SOURCES = ('local', 'cloud')
+
+
+class LatencyStat:
+    """최근 샘플의 평균 / 중앙값 / p95 (초 단위 입력, ms 출력)"""
+
+    def __init__(self, size=STATS_HISTORY):
+        self.samples = deque(maxlen=size)
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def summary(self):
+        if not self.samples:
+            return None
+        ms = np.array(self.samples) * 1000
+        return {
+            'avg_ms': round(float(ms.mean()), 1),
+            'p50_ms': round(float(np.percentile(ms, 50)), 1),
+            'p95_ms': round(float(np.percentile(ms, 95)), 1),
+        }
+
+
+class SpeculativeChat:
+    """
+    로컬 draft / 클라우드 final 레이스
+
+    Args:
+        draft: async generator 함수 draft(messages) → 텍스트 조각 (로컬 스트리밍)
+        final: async 함수 final(messages) → 전체 텍스트 (클라우드)
+        policy: 'first_wins' | 'cloud_preferred'
+        deadline: cloud_preferred 마감 (초)
+        min_chars: 승자로 인정할 최소 답변 길이
+    """
+
+    def __init__(self, draft, final, policy=POLICY_CLOUD_PREFERRED,
+                 deadline=DEFAULT_DEADLINE, min_chars=DEFAULT_MIN_CHARS):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy: {policy}")
+        self.draft = draft
+        self.final = final
+        self.policy = policy
+        self.deadline = deadline
+        self.min_chars = min_chars
+
+        self.requests = 0
+        self.wins = {source: 0 for source in SOURCES}
+        self.errors = {source: 0 for source in SOURCES}
+        self.cancelled = {source: 0 for source in SOURCES}
+        self.failures = 0          # 양쪽 모두 실패
+        self.replaced = 0          # 임시 답변이 클라우드 답변으로 교체된 횟수
+        self.deadline_misses = 0   # cloud_preferred 에서 클라우드가 마감을 넘긴 횟수
+        self.first_token = LatencyStat()   # 로컬 첫 토큰
+        self.complete = {source: LatencyStat() for source in SOURCES}
+        self.perceived = LatencyStat()     # 사용자가 첫 글자를 본 시점
+
+    def acceptable(self, text):
+        return bool(text) and len(text.strip()) >= self.min_chars
+
+    def _pick(self, policy, accepted, cloud_pending, deadline_passed):
+        """지금까지의 결과로 승자 결정 (아직이면 None)"""
+        if policy == POLICY_FIRST_WINS:
+            # 같은 배치에서 둘 다 끝났으면 클라우드 (품질 우선)
+            for source in ('cloud', 'local'):
+                if source in accepted:
+                    return source
+            return None
+
+        if 'cloud' in accepted:
+            return 'cloud'
+        if 'local' in accepted and (not cloud_pending or deadline_passed):
+            return 'local'
+        return None
+
+    async def race(self, messages, emit, policy=None, deadline=None):
+        """
+        한 요청 레이스
+
+        Args:
+            messages: 각 백엔드에 넘길 메시지 (source → messages dict 면 백엔드별로 따로)
+            emit: async emit(stage, payload)
+                  stage 'draft' → {'delta', 'text'}
+                  stage 'final' → {'source', 'text', 'replaced', 'latency'}
+                  stage 'error' → {'message'}
+
+        Returns:
+            (winner_source, text) 또는 (None, None)
+        """
+        policy = policy or self.policy
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy: {policy}")
+        deadline = self.deadline if deadline is None else deadline
+        if not isinstance(messages, dict):
+            messages = {source: messages for source in SOURCES}
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self.requests += 1
+        state = {'draft_text': '', 'draft_shown': False, 'decided': False}
+
+        async def run_draft():
+            async for delta in self.draft(messages['local']):
+                if not delta:
+                    continue
+                if not state['draft_text']:
+                    self.first_token.add(loop.time() - start)
+                state['draft_text'] += delta
+                if state['decided']:
+                    continue
+                if not state['draft_shown']:
+                    state['draft_shown'] = True
+                    self.perceived.add(loop.time() - start)
+                await emit('draft', {'delta': delta, 'text': state['draft_text']})
+            self.complete['local'].add(loop.time() - start)
+            return state['draft_text']
+
+        async def run_final():
+            text = await self.final(messages['cloud'])
+            self.complete['cloud'].add(loop.time() - start)
+            return text
+
+        tasks = {
+            asyncio.create_task(run_draft()): 'local',
+            asyncio.create_task(run_final()): 'cloud',
+        }
+        cloud_task = next(task for task, source in tasks.items() if source == 'cloud')
+        pending = set(tasks)
+        accepted = {}
+        winner = None
+
+        try:
+            while pending:
+                timeout = None
+                if policy == POLICY_CLOUD_PREFERRED and 'local' in accepted:
+                    timeout = max(0.0, start + deadline - loop.time())
+
+                done, pending = await asyncio.wait(pending, timeout=timeout,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    source = tasks[task]
+                    if task.exception() is not None:
+                        self.errors[source] += 1
+                        print(f"[AURA-HYBRID] {source} failed: {task.exception()}")
+                    elif self.acceptable(task.result()):
+                        accepted[source] = task.result()
+
+                deadline_passed = loop.time() - start >= deadline
+                winner = self._pick(policy, accepted, cloud_task in pending, deadline_passed)
+                if winner:
+                    break
+        finally:
+            # 승자가 정해졌거나 레이스 자체가 취소됨 → 남은 쪽 정리
+            state['decided'] = True
+            for task in pending:
+                task.cancel()
+                self.cancelled[tasks[task]] += 1
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        if winner is None:
+            self.failures += 1
+            await emit('error', {'message': "Both local and cloud models failed"})
+            return None, None
+
+        if winner == 'local' and policy == POLICY_CLOUD_PREFERRED and cloud_task in pending:
+            self.deadline_misses += 1
+
+        text = accepted[winner]
+        replaced = state['draft_shown'] and winner == 'cloud' and text.strip() != state['draft_text'].strip()
+        self.wins[winner] += 1
+        self.replaced += replaced
+        if not state['draft_shown']:
+            self.perceived.add(loop.time() - start)
+
+        await emit('final', {
+            'source': winner,
+            'text': text,
+            'replaced': replaced,
+            'latency': round(loop.time() - start, 3)
+        })
+        return winner, text
+
+    def stats(self):
+        finished = sum(self.wins.values()) or 1
+        return {
+            'policy': self.policy,
+            'deadline': self.deadline,
+            'requests': self.requests,
+            'wins': dict(self.wins),
+            'win_rate': {source: round(self.wins[source] / finished, 3) for source in SOURCES},
+            'errors': dict(self.errors),
+            'cancelled': dict(self.cancelled),
+            'failures': self.failures,
+            'replaced': self.replaced,
+            'deadline_misses': self.deadline_misses,
+            'latency': {
+                'local_first_token': self.first_token.summary(),
+                'local_complete': self.complete['local'].summary(),
+                'cloud_complete': self.complete['cloud'].summary(),
+                'perceived': self.perceived.summary(),
+            },
+        }
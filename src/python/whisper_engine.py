@@ -0,0 +1,257 @@
+"""
+AURA Cloud Studio - Adaptive Whisper Engine
+
+호스트 CPU / 발화 길이 / 현재 부하에 맞춰 Faster-Whisper 모델 티어를 고른다.
+
+- 짧은 셀프 벤치마크로 cpu_threads / num_workers 자동 결정 (기동 후 백그라운드에서도 실행 가능)
+- 티어별 실시간 배율(RTF: 처리시간 / 오디오길이)을 측정하고 실제 요청으로 계속 보정
+- 요청마다 예상 지연이 예산(latency budget) 안에 드는 가장 좋은 티어로 라우팅
+  → 약한 노트북은 tiny 로 1초 이내 응답, 강한 데스크톱은 base 이상 사용
+"""
+
+import os
+import time
+import wave
+
+import numpy as np
+from faster_whisper import WhisperModel
+
+# 작은 모델 → 큰 모델 순서 (뒤로 갈수록 품질 ↑ 속도 ↓)
+DEFAULT_TIERS = ("tiny", "base")
+
+# 음성 명령 한 건에 허용하는 목표 지연 (초)
+DEFAULT_LATENCY_BUDGET = 1.0
+
+# 측정 전 기본 RTF 추정치 (i3급 CPU, int8 기준)
+DEFAULT_RTF = {"tiny": 0.08, "base": 0.2, "small": 0.6, "medium": 1.5}
+
+# RTF 이동평균 가중치 (최근 요청 반영 비율)
+RTF_EWMA_ALPHA = 0.2
+
+# 벤치마크용 합성 클립 길이 (초) - Whisper 입력 샘플레이트 16kHz
+BENCHMARK_SECONDS = 2.0
+WHISPER_SAMPLE_RATE = 16000
+
+# 벤치마크 디코딩 옵션 - 합성 클립은 음성이 아니라 환각 / 온도 재시도로 디코딩 길이가 들쭉날쭉하다.
+# 온도 고정 + 토큰 상한으로 명령 한 건 분량만 디코딩해서 측정을 일정하게 유지
+BENCHMARK_DECODE = {
+    'language': "ko",
+    'temperature': 0.0,
+    'without_timestamps': True,
+    'condition_on_previous_text': False,
+    'max_new_tokens': 24,
+}
+
+# 동시 전사 워커 상한 (명령 음성은 대부분 단건)
+MAX_WORKERS = 2
+
+
+def wav_duration(file_path):
+    """WAV 파일 길이 (초). 읽을 수 없으면 None"""
+    try:
+        with wave.open(file_path, 'rb') as f:
+            return f.getnframes() / float(f.getframerate())
+    except Exception:
+        return None
+
+
+def _benchmark_clip():
+    """벤치마크 입력: 음성 대역 톤 + 약한 노이즈 (무음이면 VAD/디코더가 너무 빨리 끝나 측정이 왜곡됨)"""
+    t = np.arange(int(BENCHMARK_SECONDS * WHISPER_SAMPLE_RATE)) / WHISPER_SAMPLE_RATE
+    rng = np.random.default_rng(0)
+    clip = 0.3 * np.sin(2 * np.pi * 220 * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    clip += 0.02 * rng.standard_normal(t.shape)
+    return clip.astype(np.float32)
+
+
+class ModelTier:
+    """로드된 모델 하나 + 측정된 RTF"""
+
+    def __init__(self, name, model, rtf):
+        self.name = name
+        self.model = model
+        self.rtf = rtf
+        self.requests = 0
+
+    def observe(self, audio_seconds, elapsed):
+        if audio_seconds and audio_seconds > 0:
+            sample = elapsed / audio_seconds
+            self.rtf = (1 - RTF_EWMA_ALPHA) * self.rtf + RTF_EWMA_ALPHA * sample
+        self.requests += 1
+
+
+class WhisperEngine:
+    """
+    Tiered Faster-Whisper
+
+    Args:
+        tiers: 로드할 모델 이름 (작은 것부터)
+        latency_budget: 요청당 목표 지연 (초)
+        compute_type: CTranslate2 연산 타입 (CPU 는 int8 이 표준)
+        autotune: 기동 시 스레드 수 벤치마크 여부
+    """
+
+    def __init__(self, tiers=DEFAULT_TIERS, latency_budget=DEFAULT_LATENCY_BUDGET,
+                 compute_type="int8", autotune=True):
+        self.tier_names = tuple(tiers)
+        self.latency_budget = latency_budget
+        self.compute_type = compute_type
+        self.cpu_count = os.cpu_count() or 1
+
+        self.cpu_threads = 0  # 0 = CTranslate2 기본값
+        self.num_workers = 1
+        self.tuned = False
+        self.tiers = []
+        if autotune:
+            self.autotune()
+        else:
+            self.tiers = self._load_tiers()
+
+        if not self.tiers:
+            raise RuntimeError("No Whisper model tier could be loaded")
+
+    # ------------------------------------------------------------------
+    # Startup
+    # ------------------------------------------------------------------
+
+    def _load(self, name, cpu_threads=None, num_workers=None):
+        return WhisperModel(
+            name,
+            device="cpu",
+            compute_type=self.compute_type,
+            cpu_threads=self.cpu_threads if cpu_threads is None else cpu_threads,
+            num_workers=self.num_workers if num_workers is None else num_workers,
+        )
+
+    def _load_tiers(self, measure=False, preloaded=None):
+        """
+        티어 전체 로드
+
+        Args:
+            measure: True 면 RTF 를 벤치마크로 측정 (아니면 DEFAULT_RTF)
+            preloaded: {name: (model, rtf)} - 이미 현재 설정으로 로드 / 측정된 모델 (재로드 생략)
+        """
+        preloaded = preloaded or {}
+        tiers = []
+        for name in self.tier_names:
+            try:
+                if name in preloaded:
+                    model, rtf = preloaded[name]
+                else:
+                    model = self._load(name)
+                    rtf = self._measure_rtf(model) if measure else DEFAULT_RTF.get(name, 1.0)
+                tiers.append(ModelTier(name, model, rtf))
+                print(f"[AURA-WHISPER] Tier '{name}' ready (RTF {rtf:.3f})")
+            except Exception as e:
+                print(f"[AURA-WHISPER] Failed to load tier '{name}': {e}")
+        return tiers
+
+    @staticmethod
+    def _measure_rtf(model, repeats=1):
+        clip = _benchmark_clip()
+        # 첫 호출은 워밍업 (메모리 할당 / 커널 초기화)
+        segments, _ = model.transcribe(clip, beam_size=1, **BENCHMARK_DECODE)
+        list(segments)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            # 실제 요청과 같은 beam_size, 디코딩 길이는 BENCHMARK_DECODE 로 제한
+            segments, _ = model.transcribe(clip, beam_size=5, **BENCHMARK_DECODE)
+            list(segments)  # generator → 실제 디코딩은 소비할 때 실행
+        return (time.perf_counter() - start) / repeats / BENCHMARK_SECONDS
+
+    def autotune(self):
+        """
+        가장 작은 티어로 스레드 수 후보를 돌려보고 가장 빠른 값으로 티어 전체를 다시 로드 (Blocking)
+
+        기동 후 스레드 풀에서 호출해도 된다 - 튜닝 중에는 기존 티어로 요청을 계속 처리하고,
+        끝나면 티어 목록을 한 번에 교체한다.
+
+        Returns:
+            (cpu_threads, num_workers)
+        """
+        probe_tier = self.tier_names[0]
+        candidates = sorted({n for n in (1, 2, 4, 6, 8, self.cpu_count) if n <= self.cpu_count})
+        best = None  # (threads, num_workers, model, rtf)
+
+        for threads in candidates:
+            # 남는 코어로 동시 요청을 처리 (최소 1, 최대 MAX_WORKERS)
+            num_workers = max(1, min(MAX_WORKERS, self.cpu_count // threads))
+            try:
+                model = self._load(probe_tier, cpu_threads=threads, num_workers=num_workers)
+                rtf = self._measure_rtf(model)
+            except Exception as e:
+                print(f"[AURA-WHISPER] Autotune failed for {threads} threads: {e}")
+                continue
+            print(f"[AURA-WHISPER] Autotune: {threads} threads → RTF {rtf:.3f}")
+            # 5% 이내 차이면 적은 스레드가 낫다 (오디오 엔진/UI 몫을 남김)
+            if best is None or rtf < best[3] * 0.95:
+                best = (threads, num_workers, model, rtf)
+            # 진 후보 모델은 바로 버린다 (후보마다 모델 하나만 메모리에)
+            del model
+
+        if best is None:
+            if not self.tiers:
+                self.tiers = self._load_tiers()
+            return self.cpu_threads, self.num_workers
+
+        threads, num_workers, model, rtf = best
+        self.cpu_threads, self.num_workers = threads, num_workers
+        print(f"[AURA-WHISPER] Autotune result: cpu_threads={threads}, num_workers={num_workers}")
+
+        # 이긴 후보는 이미 최종 설정으로 로드 / 측정됐으므로 그대로 첫 티어로 사용
+        tiers = self._load_tiers(measure=True, preloaded={probe_tier: (model, rtf)})
+        if tiers:
+            self.tiers = tiers
+        self.tuned = True
+        return threads, num_workers
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def estimate_latency(self, tier, audio_seconds, queue_depth):
+        """예상 지연 = RTF × 길이 × (대기열 앞 요청 수 / 워커 수 + 1)"""
+        waves = queue_depth / self.num_workers + 1
+        return tier.rtf * audio_seconds * waves
+
+    def select_tier(self, audio_seconds, queue_depth=0):
+        """예산 안에 드는 가장 좋은 티어 (모두 넘치면 가장 빠른 티어)"""
+        if audio_seconds is None:
+            audio_seconds = BENCHMARK_SECONDS
+
+        for tier in reversed(self.tiers):
+            if self.estimate_latency(tier, audio_seconds, queue_depth) <= self.latency_budget:
+                return tier
+        return self.tiers[0]
+
+    def transcribe(self, file_path, queue_depth=0, **kwargs):
+        """
+        티어 선택 후 전사 (Blocking - 스레드 풀에서 호출할 것)
+
+        Args:
+            queue_depth: 이 요청 앞에 처리 중인 요청 수 (호출 측 스케줄러가 집계)
+
+        Returns:
+            (text, info, tier_name)
+        """
+        audio_seconds = wav_duration(file_path)
+        tier = self.select_tier(audio_seconds, queue_depth)
+
+        start = time.perf_counter()
+        segments, info = tier.model.transcribe(file_path, **kwargs)
+        text = " ".join([segment.text for segment in segments]).strip()
+        tier.observe(audio_seconds, time.perf_counter() - start)
+        return text, info, tier.name
+
+    def stats(self):
+        return {
+            'tuned': self.tuned,
+            'cpu_threads': self.cpu_threads,
+            'num_workers': self.num_workers,
+            'latency_budget': self.latency_budget,
+            'tiers': [
+                {'name': t.name, 'rtf': round(t.rtf, 4), 'requests': t.requests}
+                for t in self.tiers
+            ],
+        }
@@ -66,4 +66,17 @@ export class TransportCommands {
 
         return "⏸ Paused.";
     }
+
+    /**
+     * 템포 변경 (Tempo)
+     */
+    async setTempo(bpm: number): Promise<string> {
+        const audioStore = useAudioStore.getState();
+        const clamped = Math.min(300, Math.max(20, Math.round(bpm)));
+
+        bridge.sendCommand('/transport/tempo', { bpm: clamped });
+        audioStore.setBpm(clamped);
+
+        return `♩ Tempo: ${clamped} BPM`;
+    }
 }
@@ -2,6 +2,8 @@ import React, { useState, useEffect, useCallback } from 'react';
 import { CopilotChat } from './CopilotChat';
 import { CopilotInput } from './CopilotInput';
 import { commands } from './commands'; // [Neural Link] Import Command Registry
+import { useAudioStore } from '../../stores/audioStore';
+import type { VoiceIntent } from '../../services/SpeechService';
 
 // Define Global Types for Socket is now handled in BridgeService.ts
 // declare global {
@@ -106,8 +108,10 @@ export const Copilot: React.FC = () => {
 
     // [Neural Link] Command Router
     // 자연어 명령을 가로채서 즉시 실행하는 로직 (Keyword Spotting)
-    const checkCommand = async (text: string): Promise<boolean> => {
+    // wholeOnly: 발화 전체가 키워드 하나일 때만 실행 (문장 속 키워드는 무시)
+    const checkCommand = async (text: string, wholeOnly = false): Promise<boolean> => {
         const cmd = text.toLowerCase(); // 공백 유지 (문맥 파악용)
+        const bare = cmd.replace(/[.,!?~]/g, ' ').split(/\s+/).filter(Boolean).join(' ');
 
         // Synonyms Definitions (유의어 사전) - [Updated]
         const INTENTS = {
@@ -115,7 +119,9 @@ export const Copilot: React.FC = () => {
             STOP: ['stop', 'pause', 'silence', 'shut up', 'kill', '정지', '멈춰', '중지', '그만', '꺼', '조용'],
         };
 
-        const hasIntent = (keywords: string[]) => keywords.some(k => cmd.includes(k));
+        const hasIntent = (keywords: string[]) => wholeOnly
+            ? keywords.includes(bare)
+            : keywords.some(k => cmd.includes(k));
 
         // 1. STOP Check (Priority High - 긴급 정지)
         if (hasIntent(INTENTS.STOP)) {
@@ -134,6 +140,32 @@ export const Copilot: React.FC = () => {
         return false; // 명령어가 아님 -> LLM으로 전달
     };
 
+    // [Fast Path] Backend Intent Resolver 가 돌려준 구조화 명령 실행
+    const executeIntent = async (command: VoiceIntent): Promise<boolean> => {
+        let response: string | null = null;
+
+        switch (command.intent) {
+            case 'transport.play':
+                response = await commands.transport.play();
+                break;
+            case 'transport.stop':
+                response = await commands.transport.stop();
+                break;
+            case 'transport.pause':
+                response = await commands.transport.pause();
+                break;
+            case 'transport.tempo': {
+                const bpm = command.args.bpm ?? useAudioStore.getState().bpm + (command.args.delta ?? 0);
+                response = await commands.transport.setTempo(bpm);
+                break;
+            }
+        }
+
+        if (response === null) return false; // 모르는 명령 -> 기존 경로로
+        addMessage('cloud', 'ai', response);
+        return true;
+    };
+
     // [New] Voice Engine Integration
     const [showCalibration, setShowCalibration] = useState(false);
     const [voiceActive, setVoiceActive] = useState(false);
@@ -192,13 +224,22 @@ export const Copilot: React.FC = () => {
             });
 
             // 4. [UNICORN] Chat Injection Listener
-            const onVoiceCommand = (e: CustomEvent<{ text: string }>) => {
+            const onVoiceCommand = (e: CustomEvent<{ text: string; command?: VoiceIntent | null }>) => {
                 const text = e.detail?.text;
+                const command = e.detail?.command;
                 if (text) {
                     console.log(`[Copilot] 📩 Received Voice Command: "${text}"`);
                     // [Neural Link Updated] Voice -> Cloud Brain (DeepSeek)
                     // 1. Check if it's a Functional Command ("Play", "Stop")
-                    checkCommand(text).then(isCommand => {
+                    //    Backend 가 이미 매칭했으면 그대로 실행.
+                    //    Backend 가 명령이 아니라고 판정했으면(null) 발화 전체가 키워드일 때만 실행
+                    //    ("조용", "ray" 같은 오인식 키워드는 그대로 실행하고,
+                    //     "트랩 비트는 어떻게 시작해?" 는 '시작' 으로 재생되지 않도록 LLM 으로).
+                    //    Resolver 를 거치지 않은 결과(undefined)는 기존 키워드 검사
+                    const run = command
+                        ? executeIntent(command)
+                        : checkCommand(text, command === null);
+                    run.then(isCommand => {
                         if (isCommand) {
                             // Command Executed Locally -> Log to CLOUD Window
                             addMessage('cloud', 'user', text); // [Fix] Changed to Cloud
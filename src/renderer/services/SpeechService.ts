@@ -6,6 +6,14 @@ interface SpeechStatus {
     listening: boolean;
 }
 
+/** Backend Intent Resolver 결과 (recognition_result.command) */
+export interface VoiceIntent {
+    intent: string; // e.g. 'transport.play', 'transport.stop', 'transport.tempo'
+    args: { bpm?: number; delta?: number };
+    score: number;
+    matched: string;
+}
+
 class SpeechService {
     private isListening = false;
     private injectTarget: any | null = null;
@@ -124,7 +132,8 @@ class SpeechService {
                         this.isListening = false;
 
                         if (data.success && data.text) {
-                            this.handleResult(data.text);
+                            // [Fast Path] Backend Intent Resolver 가 매칭한 명령이면 LLM 없이 바로 실행
+                            this.handleResult(data.text, data.command);
                             // Also call the original callback if it wants to know
                             if (this.callbacks?.onResult) this.callbacks.onResult(data.text);
                         } else {
@@ -162,11 +171,17 @@ class SpeechService {
         }
     }
 
-    private handleResult(text: string) {
+    /**
+     * @param command Backend Intent Resolver 결과
+     *   - VoiceIntent: 매칭된 명령
+     *   - null: Resolver 가 명령이 아니라고 판정 (발화 전체가 키워드가 아니면 LLM 으로)
+     *   - undefined: Resolver 를 거치지 않은 결과 (브라우저 STT 등)
+     */
+    private handleResult(text: string, command?: VoiceIntent | null) {
         this.updateStatus(`✅ Recognized: "${text}"`);
 
         // Inject into Chat
-        const event = new CustomEvent('aura-voice-command', { detail: { text } });
+        const event = new CustomEvent('aura-voice-command', { detail: { text, command } });
         window.dispatchEvent(event);
     }
 